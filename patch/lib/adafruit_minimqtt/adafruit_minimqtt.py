@@ -34,6 +34,11 @@ from random import randint
 from micropython import const
 from .matcher import MQTTMatcher
 
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
 __version__ = "0.0.0+auto.0"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_MiniMQTT.git"
 
@@ -135,6 +140,22 @@ class MQTT:
     :param int socket_timeout: How often to check socket state for read/write/connect operations,
         in seconds.
     :param int connect_retries: How many times to try to connect to broker before giving up.
+    :param int inflight_window: Maximum number of unacknowledged QoS 1 publishes
+        sent without blocking; further publishes are queued until PUBACKs arrive.
+    :param int retransmit_timeout: Seconds to wait for a PUBACK before resending
+        an in-flight QoS 1 publish.
+    :param int max_retransmits: How many times to resend an in-flight publish
+        before giving up on it.
+    :param int rx_buffer_size: Size of the preallocated receive buffer. Incoming
+        packets are parsed straight out of it; larger payloads are read separately.
+    :param int tx_buffer_size: Size of the preallocated send buffer. Outgoing
+        packets are assembled in it and written with a single send.
+    :param int offline_queue_size: How many topics to hold publishes for while
+        disconnected. Only the latest message per topic is kept; they are sent
+        by `reconnect()`.
+    :param int outbox_size: How many non-blocking publishes to hold while the
+        in-flight window is full. A newer publish to a queued topic replaces the
+        queued one; beyond that the oldest is dropped.
 
     """
 
@@ -154,6 +175,13 @@ class MQTT:
         use_binary_mode=False,
         socket_timeout=1,
         connect_retries=5,
+        inflight_window=8,
+        retransmit_timeout=5,
+        max_retransmits=3,
+        rx_buffer_size=512,
+        tx_buffer_size=512,
+        offline_queue_size=16,
+        outbox_size=16,
     ):
 
         self._socket_pool = socket_pool
@@ -175,9 +203,33 @@ class MQTT:
         self._is_connected = False
         self._msg_size_lim = MQTT_MSG_SZ_LIM
         self._pid = 0
-        self._timestamp = 0
+        self._timestamp = 0  # when the last PINGREQ was sent
+        self._ping_sent = None  # set while a PINGRESP is outstanding
         self.logger = None
 
+        # In-flight QoS 1 publishes: pid -> [packet, topic, sent stamp, retries]
+        self._inflight = {}
+        self._inflight_window = inflight_window
+        self._retransmit_timeout = retransmit_timeout
+        self._max_retransmits = max_retransmits
+        self._outbox = []  # publishes waiting for a free in-flight slot
+        self._outbox_size = outbox_size
+
+        # Receive buffer: unread bytes live in _rx_buf[_rx_start:_rx_end]
+        self._rx_buf = bytearray(rx_buffer_size)
+        self._rx_view = memoryview(self._rx_buf)
+        self._rx_start = 0
+        self._rx_end = 0
+
+        # Publishes made while disconnected: topic -> (msg, retain, qos)
+        self._offline = {}
+        self._offline_order = []  # topics, oldest first
+        self._offline_queue_size = offline_queue_size
+
+        # Send buffer: each outgoing packet is assembled here, then sent at once
+        self._tx_buf = bytearray(tx_buffer_size)
+        self._tx_view = memoryview(self._tx_buf)
+
         self.broker = broker
         self._username = username
         self._password = password
@@ -215,6 +267,8 @@ class MQTT:
 
         # List of subscribed topics, used for tracking
         self._subscribed_topics = []
+        self._subscribed_qos = {}  # topic -> QoS, replayed on reconnect
+        self._pending_subs = {}  # SUBSCRIBE pid -> topics awaiting a SUBACK
         self._on_message_filtered = MQTTMatcher()
 
         # Default topic callback methods
@@ -222,6 +276,9 @@ class MQTT:
         self.on_connect = None
         self.on_disconnect = None
         self.on_publish = None
+        # on_publish_expired(client, userdata, topic, pid): a QoS 1 publish was
+        # abandoned after max_retransmits resends
+        self.on_publish_expired = None
         self.on_subscribe = None
         self.on_unsubscribe = None
 
@@ -310,35 +367,6 @@ class MQTT:
     def __exit__(self, exception_type, exception_value, traceback):
         self.deinit()
 
-    def _sock_exact_recv(self, bufsize):
-        """Reads _exact_ number of bytes from the connected socket. Will only return
-        string with the exact number of bytes requested.
-
-        The semantics of native socket receive is that it returns no more than the
-        specified number of bytes (i.e. max size). However, it makes no guarantees in
-        terms of the minimum size of the buffer, which could be 1 byte. This is a
-        wrapper for socket recv() to ensure that no less than the expected number of
-        bytes is returned or trigger a timeout exception.
-
-        :param int bufsize: number of bytes to receive
-        """
-        stamp = time.monotonic()
-        rc = self._sock.recv(bufsize)
-        to_read = bufsize - len(rc)
-        assert to_read >= 0
-        read_timeout = self.keep_alive
-        while to_read > 0:
-            recv = self._sock.recv(to_read)
-            to_read -= len(recv)
-            rc += recv
-            if time.monotonic() - stamp > read_timeout:
-                raise MMQTTException(
-                    "Unable to receive {} bytes within {} seconds.".format(
-                        to_read, read_timeout
-                    )
-                )
-        return rc
-
     def deinit(self):
         """De-initializes the MQTT client and disconnects from the mqtt broker."""
         self.disconnect()
@@ -446,7 +474,6 @@ class MQTT:
         if password is not None:
             self._password = password
 
-    # pylint: disable=too-many-branches, too-many-statements, too-many-locals
     def connect(self, clean_session=True, host=None, port=None, keep_alive=None):
         """Initiates connection with the MQTT Broker.
 
@@ -456,6 +483,47 @@ class MQTT:
         :param int keep_alive: Maximum period allowed for communication, in seconds.
 
         """
+        self._send_connect(clean_session, host, port, keep_alive)
+        stamp = time.monotonic()
+        while True:
+            op = self._wait_for_msg()
+            if op == 32:
+                return self._handle_connack()
+
+            if op is None:
+                if time.monotonic() - stamp > self._recv_timeout:
+                    raise MMQTTException(
+                        f"No data received from broker for {self._recv_timeout} seconds."
+                    )
+
+    async def connect_async(
+        self, clean_session=True, host=None, port=None, keep_alive=None, interval=0.05
+    ):
+        """Like `connect()`, but yields to other tasks while waiting for CONNACK.
+
+        The socket is polled every `interval` seconds until CONNACK arrives or
+        `recv_timeout` passes. Opening the socket itself is still synchronous.
+        """
+        self._send_connect(clean_session, host, port, keep_alive)
+        stamp = time.monotonic()
+        while True:
+            # A zero timeout would block on ESP32SPI sockets
+            self._sock.settimeout(0.000001)
+            op = self._wait_for_msg(self._socket_timeout)
+            if op == 32:
+                return self._handle_connack()
+
+            if op is None:
+                if time.monotonic() - stamp > self._recv_timeout:
+                    self._sock.close()
+                    raise MMQTTException(
+                        f"No data received from broker for {self._recv_timeout} seconds."
+                    )
+                await asyncio.sleep(interval)
+
+    # pylint: disable=too-many-branches, too-many-statements, too-many-locals
+    def _send_connect(self, clean_session, host, port, keep_alive):
+        """Opens a new socket to the broker and sends CONNECT on it."""
         if host:
             self.broker = host
         if port:
@@ -470,94 +538,68 @@ class MQTT:
         self._sock = self._get_connect_socket(
             self.broker, self.port, timeout=self._socket_timeout
         )
+        self._rx_start = self._rx_end = 0
+        self._pending_subs = {}
+
+        client_id = self.client_id.encode("utf-8")
+        strings = [client_id]
+        if self._lw_topic:
+            # [MQTT-3.1.3-11]
+            strings.append(self._lw_topic.encode("utf-8"))
+            strings.append(self._lw_msg)
+        if self._username is not None:
+            strings.append(self._username.encode("utf-8"))
+            strings.append(self._password.encode("utf-8"))
+        # Variable header is a 0x00 protocol name length MSB, then MQTT_HDR_CONNECT
+        remaining_length = 1 + len(MQTT_HDR_CONNECT) + sum(2 + len(v) for v in strings)
+        buf = self._tx_packet(5 + remaining_length)
 
         # Fixed Header
-        fixed_header = bytearray([0x10])
+        buf[0] = 0x10
+        offset = self._pack_remaining_length(buf, 1, remaining_length)
 
         # NOTE: Variable header is
-        # MQTT_HDR_CONNECT = bytearray(b"\x04MQTT\x04\x02\0\0")
-        # because final 4 bytes are 4, 2, 0, 0
-        var_header = MQTT_HDR_CONNECT
-        var_header[6] = clean_session << 1
-
-        # Set up variable header and remaining_length
-        remaining_length = 12 + len(self.client_id.encode("utf-8"))
-        if self._username:
-            remaining_length += (
-                2
-                + len(self._username.encode("utf-8"))
-                + 2
-                + len(self._password.encode("utf-8"))
-            )
-            var_header[6] |= 0xC0
+        # b"\0" + MQTT_HDR_CONNECT = b"\0\x04MQTT\x04\x02\0\0"
+        # i.e. protocol name, level 4, connect flags, then 2 byte keep alive
+        flags = offset + 7
+        buf[offset] = 0x00
+        offset += 1
+        buf[offset : offset + len(MQTT_HDR_CONNECT)] = MQTT_HDR_CONNECT
+        offset += len(MQTT_HDR_CONNECT)
+        buf[flags] = clean_session << 1
+        if self._username is not None:
+            buf[flags] |= 0xC0
         if self.keep_alive:
             assert self.keep_alive < MQTT_TOPIC_LENGTH_LIMIT
-            var_header[7] |= self.keep_alive >> 8
-            var_header[8] |= self.keep_alive & 0x00FF
+            buf[flags + 1] = self.keep_alive >> 8
+            buf[flags + 2] = self.keep_alive & 0x00FF
         if self._lw_topic:
-            remaining_length += (
-                2 + len(self._lw_topic.encode("utf-8")) + 2 + len(self._lw_msg)
-            )
-            var_header[6] |= 0x4 | (self._lw_qos & 0x1) << 3 | (self._lw_qos & 0x2) << 3
-            var_header[6] |= self._lw_retain << 5
-
-        # Remaining length calculation
-        large_rel_length = False
-        if remaining_length > 0x7F:
-            large_rel_length = True
-            # Calculate Remaining Length [2.2.3]
-            while remaining_length > 0:
-                encoded_byte = remaining_length % 0x80
-                remaining_length = remaining_length // 0x80
-                # if there is more data to encode, set the top bit of the byte
-                if remaining_length > 0:
-                    encoded_byte |= 0x80
-                fixed_header.append(encoded_byte)
-        if large_rel_length:
-            fixed_header.append(0x00)
-        else:
-            fixed_header.append(remaining_length)
-            fixed_header.append(0x00)
+            buf[flags] |= 0x4 | (self._lw_qos & 0x1) << 3 | (self._lw_qos & 0x2) << 3
+            buf[flags] |= self._lw_retain << 5
+
+        # [MQTT-3.1.3-4] client id, then will topic/message and credentials
+        for value in strings:
+            offset = self._pack_str(buf, offset, value)
 
         if self.logger is not None:
             self.logger.debug("Sending CONNECT to broker...")
-            self.logger.debug(
-                "Fixed Header: %s\nVariable Header: %s", fixed_header, var_header
-            )
-        self._sock.send(fixed_header)
-        self._sock.send(var_header)
-        # [MQTT-3.1.3-4]
-        self._send_str(self.client_id)
-        if self._lw_topic:
-            # [MQTT-3.1.3-11]
-            self._send_str(self._lw_topic)
-            self._send_str(self._lw_msg)
-        if self._username is None:
-            self._username = None
-        else:
-            self._send_str(self._username)
-            self._send_str(self._password)
+        self._send_packet(buf, offset)
         if self.logger is not None:
             self.logger.debug("Receiving CONNACK packet from broker")
-        stamp = time.monotonic()
-        while True:
-            op = self._wait_for_msg()
-            if op == 32:
-                rc = self._sock_exact_recv(3)
-                assert rc[0] == 0x02
-                if rc[2] != 0x00:
-                    raise MMQTTException(CONNACK_ERRORS[rc[2]])
-                self._is_connected = True
-                result = rc[0] & 1
-                if self.on_connect is not None:
-                    self.on_connect(self, self._user_data, result, rc[2])
-                return result
 
-            if op is None:
-                if time.monotonic() - stamp > self._recv_timeout:
-                    raise MMQTTException(
-                        f"No data received from broker for {self._recv_timeout} seconds."
-                    )
+    def _handle_connack(self):
+        """Reads the rest of a CONNACK and marks the client connected."""
+        rc = self._sock_exact_recv(3)
+        assert rc[0] == 0x02
+        if rc[2] != 0x00:
+            raise MMQTTException(CONNACK_ERRORS[rc[2]])
+        self._is_connected = True
+        self._timestamp = time.monotonic()
+        self._ping_sent = None
+        result = rc[0] & 1
+        if self.on_connect is not None:
+            self.on_connect(self, self._user_data, result, rc[2])
+        return result
 
     def disconnect(self):
         """Disconnects the MiniMQTT client from the MQTT broker."""
@@ -574,6 +616,7 @@ class MQTT:
         self._sock.close()
         self._is_connected = False
         self._subscribed_topics = []
+        self._subscribed_qos = {}
         if self.on_disconnect is not None:
             self.on_disconnect(self, self._user_data, 0)
 
@@ -597,19 +640,61 @@ class MQTT:
                 raise MMQTTException("PINGRESP not returned from broker.")
         return rcs
 
+    def send_ping(self):
+        """Sends a PINGREQ without waiting. The PINGRESP is picked up by `loop()`."""
+        self.is_connected()
+        if self.logger is not None:
+            self.logger.debug("Sending PINGREQ")
+        self._sock.send(MQTT_PINGREQ)
+        self._timestamp = time.monotonic()
+        if self._ping_sent is None:
+            self._ping_sent = self._timestamp
+
+    def check_keepalive(self):
+        """Sends a PINGREQ once per `keep_alive / 2` seconds. Raises if the oldest
+        unanswered one has waited more than `recv_timeout` seconds.
+        """
+        now = time.monotonic()
+        if self._ping_sent is not None and now - self._ping_sent > self._recv_timeout:
+            raise MMQTTException("PINGRESP not returned from broker.")
+        if now - self._timestamp >= self.keep_alive / 2:
+            self.send_ping()
+
+    async def keepalive(self, interval=1):
+        """Keeps the connection alive alongside an application calling `loop()`.
+
+        Checks every `interval` seconds without waiting on the broker. A missed
+        PINGRESP drops the connection, ready for `reconnect()`.
+        """
+        while True:
+            if self._sock is not None and self._is_connected:
+                try:
+                    self.check_keepalive()
+                except (OSError, RuntimeError, MMQTTException) as error:
+                    self._connection_lost(error)
+            await asyncio.sleep(interval)
+
     # pylint: disable=too-many-branches, too-many-statements
-    def publish(self, topic, msg, retain=False, qos=0):
+    def publish(self, topic, msg, retain=False, qos=0, blocking=True):
         """Publishes a message to a topic provided.
 
         :param str topic: Unique topic identifier.
         :param str|int|float|bytes msg: Data to send to the broker.
         :param bool retain: Whether the message is saved by the broker.
         :param int qos: Quality of Service level for the message, defaults to zero.
+        :param bool blocking: For QoS 1, wait for the PUBACK before returning. When
+            False the packet is tracked in the in-flight table and acknowledged by
+            `loop()`; if the in-flight window is full it is queued instead.
+
+        While disconnected, the message is queued (latest value per topic) and
+        sent on `reconnect()`.
 
+        Returns the packet identifier for QoS 1 publishes, or None if queued.
         """
-        self.is_connected()
-        self._valid_topic(topic)
-        if "+" in topic or "#" in topic:
+        # Callers publishing to the same topic repeatedly can pass encoded bytes
+        topic_bytes = topic if isinstance(topic, bytes) else topic.encode("utf-8")
+        self._valid_topic(topic_bytes)
+        if b"+" in topic_bytes or b"#" in topic_bytes:
             raise MMQTTException("Publish topic can not contain wildcards.")
         # check msg/qos kwargs
         if msg is None:
@@ -627,32 +712,38 @@ class MQTT:
         assert (
             0 <= qos <= 1
         ), "Quality of Service Level 2 is unsupported by this library."
+        if self._sock is None or not self._is_connected:
+            self._queue_offline(topic, msg, retain, qos)
+            return None
+        if qos == 1 and not blocking and not self._inflight_available():
+            self._queue_outbox(topic, msg, retain, qos)
+            return None
 
-        # fixed header. [3.3.1.2], [3.3.1.3]
-        pub_hdr_fixed = bytearray([0x30 | retain | qos << 1])
-
-        # variable header = 2-byte Topic length (big endian)
-        pub_hdr_var = bytearray(struct.pack(">H", len(topic.encode("utf-8"))))
-        pub_hdr_var.extend(topic.encode("utf-8"))  # Topic name
-
-        remaining_length = 2 + len(msg) + len(topic.encode("utf-8"))
+        remaining_length = 2 + len(topic_bytes) + len(msg)
         if qos > 0:
             # packet identifier where QoS level is 1 or 2. [3.3.2.2]
             remaining_length += 2
             self._pid = self._pid + 1 if self._pid < 0xFFFF else 1
-            pub_hdr_var.append(self._pid >> 8)
-            pub_hdr_var.append(self._pid & 0xFF)
+        # In-flight publishes keep their own copy for retransmission
+        size = 2 + remaining_length
+        length = remaining_length >> 7
+        while length:
+            size += 1
+            length >>= 7
+        buf = bytearray(size) if qos == 1 else self._tx_packet(size)
 
+        # fixed header. [3.3.1.2], [3.3.1.3]
+        buf[0] = 0x30 | retain | qos << 1
         # Calculate remaining length [2.2.3]
-        if remaining_length > 0x7F:
-            while remaining_length > 0:
-                encoded_byte = remaining_length % 0x80
-                remaining_length = remaining_length // 0x80
-                if remaining_length > 0:
-                    encoded_byte |= 0x80
-                pub_hdr_fixed.append(encoded_byte)
-        else:
-            pub_hdr_fixed.append(remaining_length)
+        offset = self._pack_remaining_length(buf, 1, remaining_length)
+        # variable header = 2-byte Topic length (big endian) and Topic name
+        offset = self._pack_str(buf, offset, topic_bytes)
+        if qos > 0:
+            buf[offset] = self._pid >> 8
+            buf[offset + 1] = self._pid & 0xFF
+            offset += 2
+        buf[offset : offset + len(msg)] = msg
+        offset += len(msg)
 
         if self.logger is not None:
             self.logger.debug(
@@ -663,32 +754,122 @@ class MQTT:
                 qos,
                 retain,
             )
-        self._sock.send(pub_hdr_fixed)
-        self._sock.send(pub_hdr_var)
-        self._sock.send(msg)
+        try:
+            self._send_packet(buf, offset)
+        except (OSError, RuntimeError) as error:
+            self._connection_lost(error)
+            self._queue_offline(topic, msg, retain, qos)
+            return None
         if qos == 0 and self.on_publish is not None:
             self.on_publish(self, self._user_data, topic, self._pid)
         if qos == 1:
+            pid = self._pid
+            self._inflight[pid] = [
+                buf,
+                topic,
+                time.monotonic(),
+                0,
+            ]
+            if not blocking:
+                return pid
+            # PUBACKs (ours or any other in-flight one) are resolved by _wait_for_msg
             stamp = time.monotonic()
-            while True:
+            while pid in self._inflight:
                 op = self._wait_for_msg()
-                if op == 0x40:
-                    sz = self._sock_exact_recv(1)
-                    assert sz == b"\x02"
-                    rcv_pid = self._sock_exact_recv(2)
-                    rcv_pid = rcv_pid[0] << 0x08 | rcv_pid[1]
-                    if self._pid == rcv_pid:
-                        if self.on_publish is not None:
-                            self.on_publish(self, self._user_data, topic, rcv_pid)
-                        return
-
                 if op is None:
                     if time.monotonic() - stamp > self._recv_timeout:
                         raise MMQTTException(
                             f"No data received from broker for {self._recv_timeout} seconds."
                         )
+            return pid
+        return None
+
+    def _queue_outbox(self, topic, msg, retain, qos):
+        for i, entry in enumerate(self._outbox):
+            if entry[0] == topic:
+                # Not sent yet, so the newer message simply supersedes it
+                self._outbox[i] = (topic, msg, retain, qos)
+                return
+        if len(self._outbox) >= self._outbox_size:
+            dropped = self._outbox.pop(0)
+            if self.logger is not None:
+                self.logger.warning("Outbox full, dropping PUBLISH to %s", dropped[0])
+        self._outbox.append((topic, msg, retain, qos))
+
+    def _queue_offline(self, topic, msg, retain, qos):
+        if topic in self._offline:
+            self._offline_order.remove(topic)
+        elif len(self._offline_order) >= self._offline_queue_size:
+            del self._offline[self._offline_order.pop(0)]
+        self._offline[topic] = (msg, retain, qos)
+        self._offline_order.append(topic)
+
+    def _flush_offline(self):
+        while self._offline_order and self._is_connected:
+            topic = self._offline_order.pop(0)
+            msg, retain, qos = self._offline.pop(topic)
+            self.publish(topic, msg, retain, qos, blocking=False)
+
+    def _connection_lost(self, error):
+        """Drops a broken connection so that `reconnect()` can replace it.
+        Subscriptions, in-flight and queued publishes are kept for the new one.
+        """
+        if not self._is_connected:
+            return
+        if self.logger is not None:
+            self.logger.warning("Connection lost: {}".format(error))
+        self._is_connected = False
+        self._rx_start = self._rx_end = 0
+        try:
+            self._sock.close()
+        except (OSError, RuntimeError):
+            pass
+        if self.on_disconnect is not None:
+            self.on_disconnect(self, self._user_data, error)
+
+    def pending_publishes(self):
+        """Number of QoS 1 publishes awaiting a PUBACK or a free in-flight slot."""
+        return len(self._inflight) + len(self._outbox)
+
+    def _inflight_available(self):
+        return len(self._inflight) < self._inflight_window
+
+    def _handle_puback(self, pid):
+        entry = self._inflight.pop(pid, None)
+        if entry is None:
+            return
+        if self.on_publish is not None:
+            self.on_publish(self, self._user_data, entry[1], pid)
+        self._flush_outbox()
+
+    def _flush_outbox(self):
+        while self._outbox and self._inflight_available():
+            self.publish(*self._outbox.pop(0), blocking=False)
+
+    def _check_inflight(self):
+        """Resends in-flight publishes whose PUBACK is overdue, with DUP set."""
+        if not self._inflight:
+            return
+        now = time.monotonic()
+        for pid, entry in list(self._inflight.items()):
+            if now - entry[2] < self._retransmit_timeout:
+                continue
+            if entry[3] >= self._max_retransmits:
+                del self._inflight[pid]
+                if self.logger is not None:
+                    self.logger.warning("Abandoning PUBLISH %d to %s", pid, entry[1])
+                if self.on_publish_expired is not None:
+                    self.on_publish_expired(self, self._user_data, entry[1], pid)
+                continue
+            entry[0][0] |= 0x08  # DUP flag [MQTT-3.3.1-1]
+            entry[2] = now
+            entry[3] += 1
+            if self.logger is not None:
+                self.logger.debug("Resending PUBLISH %d to %s", pid, entry[1])
+            self._sock.send(entry[0])
+        self._flush_outbox()
 
-    def subscribe(self, topic, qos=0):
+    def subscribe(self, topic, qos=0, blocking=True):
         """Subscribes to a topic on the MQTT Broker.
         This method can subscribe to one topics or multiple topics.
 
@@ -701,7 +882,12 @@ class MQTT:
         :param int qos: Quality of Service level for the topic, defaults to
                         zero. Conventional options are ``0`` (send at most once), ``1``
                         (send at least once), or ``2`` (send exactly once).
+        :param bool blocking: Wait for the SUBACK before returning. When False the
+                              SUBACK is handled by `loop()`, and a topic the broker
+                              refuses is dropped from the subscriptions.
 
+        Topics are recorded as subscribed as soon as the SUBSCRIBE is sent, so
+        `reconnect()` replays them even if the SUBACK never arrived.
         """
         self.is_connected()
         topics = None
@@ -720,41 +906,59 @@ class MQTT:
                 self._valid_topic(t)
                 topics.append((t, q))
         # Assemble packet
-        packet_length = 2 + (2 * len(topics)) + (1 * len(topics))
-        packet_length += sum(len(topic.encode("utf-8")) for topic, qos in topics)
-        packet_length_byte = packet_length.to_bytes(1, "big")
+        encoded = [(t.encode("utf-8"), q) for t, q in topics]
+        remaining_length = 2 + sum(3 + len(t) for t, q in encoded)
+        buf = self._tx_packet(5 + remaining_length)
+        buf[0] = MQTT_SUB[0]
+        offset = self._pack_remaining_length(buf, 1, remaining_length)
         self._pid = self._pid + 1 if self._pid < 0xFFFF else 1
-        packet_id_bytes = self._pid.to_bytes(2, "big")
-        # Packet with variable and fixed headers
-        packet = MQTT_SUB + packet_length_byte + packet_id_bytes
+        pid = self._pid
+        buf[offset] = pid >> 8
+        buf[offset + 1] = pid & 0xFF
+        offset += 2
         # attaching topic and QOS level to the packet
-        for t, q in topics:
-            topic_size = len(t.encode("utf-8")).to_bytes(2, "big")
-            qos_byte = q.to_bytes(1, "big")
-            packet += topic_size + t.encode() + qos_byte
+        for t, q in encoded:
+            offset = self._pack_str(buf, offset, t)
+            buf[offset] = q
+            offset += 1
         if self.logger is not None:
             for t, q in topics:
                 self.logger.debug("SUBSCRIBING to topic %s with QoS %d", t, q)
-        self._sock.send(packet)
+        self._send_packet(buf, offset)
+        for t, q in topics:
+            if t not in self._subscribed_qos:
+                self._subscribed_topics.append(t)
+            self._subscribed_qos[t] = q
+        self._pending_subs[pid] = topics
+        if not blocking:
+            return pid
         stamp = time.monotonic()
-        while True:
-            op = self._wait_for_msg()
-            if op == 0x90:
-                rc = self._sock_exact_recv(4)
-                assert rc[1] == packet[2] and rc[2] == packet[3]
-                if rc[3] == 0x80:
-                    raise MMQTTException("SUBACK Failure!")
-                for t, q in topics:
-                    if self.on_subscribe is not None:
-                        self.on_subscribe(self, self._user_data, t, q)
-                    self._subscribed_topics.append(t)
-                return
-
-            if op is None:
+        while pid in self._pending_subs:
+            if self._wait_for_msg() is None:
                 if time.monotonic() - stamp > self._recv_timeout:
                     raise MMQTTException(
                         f"No data received from broker for {self._recv_timeout} seconds."
                     )
+        for t, q in topics:
+            if t not in self._subscribed_qos:
+                raise MMQTTException("SUBACK Failure for topic {}!".format(t))
+        return pid
+
+    def _handle_suback(self, pid, codes):
+        topics = self._pending_subs.pop(pid, None)
+        if topics is None:
+            return
+        if len(codes) != len(topics):
+            raise MMQTTException("Unexpected SUBACK length: {}.".format(len(codes)))
+        for (t, q), code in zip(topics, codes):
+            if code == 0x80:
+                if self.logger is not None:
+                    self.logger.warning("SUBACK Failure for topic %s", t)
+                if t in self._subscribed_qos:
+                    self._subscribed_topics.remove(t)
+                    del self._subscribed_qos[t]
+            elif self.on_subscribe is not None:
+                self.on_subscribe(self, self._user_data, t, q)
 
     def unsubscribe(self, topic):
         """Unsubscribes from a MQTT topic.
@@ -777,19 +981,21 @@ class MQTT:
                     "Topic must be subscribed to before attempting unsubscribe."
                 )
         # Assemble packet
-        packet_length = 2 + (2 * len(topics))
-        packet_length += sum(len(topic.encode("utf-8")) for topic in topics)
-        packet_length_byte = packet_length.to_bytes(1, "big")
+        encoded = [t.encode("utf-8") for t in topics]
+        remaining_length = 2 + sum(2 + len(t) for t in encoded)
+        buf = self._tx_packet(5 + remaining_length)
+        buf[0] = MQTT_UNSUB[0]
+        offset = self._pack_remaining_length(buf, 1, remaining_length)
         self._pid = self._pid + 1 if self._pid < 0xFFFF else 1
         packet_id_bytes = self._pid.to_bytes(2, "big")
-        packet = MQTT_UNSUB + packet_length_byte + packet_id_bytes
-        for t in topics:
-            topic_size = len(t.encode("utf-8")).to_bytes(2, "big")
-            packet += topic_size + t.encode()
+        buf[offset : offset + 2] = packet_id_bytes
+        offset += 2
+        for t in encoded:
+            offset = self._pack_str(buf, offset, t)
         if self.logger is not None:
             for t in topics:
                 self.logger.debug("UNSUBSCRIBING from topic %s", t)
-        self._sock.send(packet)
+        self._send_packet(buf, offset)
         if self.logger is not None:
             self.logger.debug("Waiting for UNSUBACK...")
         while True:
@@ -804,6 +1010,7 @@ class MQTT:
                     if self.on_unsubscribe is not None:
                         self.on_unsubscribe(self, self._user_data, t, self._pid)
                     self._subscribed_topics.remove(t)
+                    self._subscribed_qos.pop(t, None)
                 return
 
             if op is None:
@@ -821,18 +1028,42 @@ class MQTT:
         if self.logger is not None:
             self.logger.debug("Attempting to reconnect with MQTT broker")
         self.connect()
+        self._restore_session(resub_topics)
+
+    async def reconnect_async(self, resub_topics=True):
+        """Like `reconnect()`, but yields to other tasks while waiting for CONNACK.
+
+        :param bool resub_topics: Resubscribe to previously subscribed topics.
+
+        """
+        if self.logger is not None:
+            self.logger.debug("Attempting to reconnect with MQTT broker")
+        await self.connect_async()
+        self._restore_session(resub_topics)
+
+    def _restore_session(self, resub_topics):
+        """Resends unacknowledged publishes and replays subscriptions after a reconnect."""
         if self.logger is not None:
             self.logger.debug("Reconnected with broker")
+        # Unacknowledged publishes are resent on the new connection
+        for entry in self._inflight.values():
+            entry[0][0] |= 0x08
+            entry[2] = time.monotonic()
+            self._sock.send(entry[0])
         if resub_topics:
             if self.logger is not None:
                 self.logger.debug(
                     "Attempting to resubscribe to previously subscribed topics."
                 )
-            subscribed_topics = self._subscribed_topics.copy()
+            # Replayed as a single SUBSCRIBE, keeping each topic's QoS; the
+            # SUBACK is handled by loop() so reconnecting never waits on it
+            qos = self._subscribed_qos
+            topics = [(t, qos.get(t, 0)) for t in self._subscribed_topics]
             self._subscribed_topics = []
-            while subscribed_topics:
-                feed = subscribed_topics.pop()
-                self.subscribe(feed)
+            self._subscribed_qos = {}
+            if topics:
+                self.subscribe(topics, blocking=False)
+        self._flush_offline()
 
     def loop(self, timeout=0):
         # pylint: disable = too-many-return-statements
@@ -844,18 +1075,17 @@ class MQTT:
 
         """
 
-        if self._timestamp == 0:
-            self._timestamp = time.monotonic()
-        current_time = time.monotonic()
-        if current_time - self._timestamp >= self.keep_alive:
-            self._timestamp = 0
-            # Handle KeepAlive by expecting a PINGREQ/PINGRESP from the server
-            if self.logger is not None:
-                self.logger.debug(
-                    "KeepAlive period elapsed - requesting a PINGRESP from the server..."
-                )
-            rcs = self.ping()
-            return rcs
+        self.is_connected()
+        try:
+            return self._loop(timeout)
+        except (OSError, RuntimeError, MMQTTException) as error:
+            # Leave the session ready for reconnect() before reporting
+            self._connection_lost(error)
+            raise
+
+    def _loop(self, timeout):
+        # KeepAlive is handled by the keepalive() task, so this never blocks on it
+        self._check_inflight()
 
         stamp = time.monotonic()
         self._sock.settimeout(timeout)
@@ -879,27 +1109,20 @@ class MQTT:
         # pylint: disable = too-many-return-statements
 
         """Reads and processes network events."""
-        # CPython socket module contains a timeout attribute
-        if hasattr(self._socket_pool, "timeout"):
-            try:
-                res = self._sock_exact_recv(1)
-            except self._socket_pool.timeout:
+        try:
+            op = self._sock_exact_recv(1)[0]
+        except OSError as error:
+            if self._is_timeout(error):
+                # raised by a socket timeout if 0 bytes were present
                 return None
-        else:  # socketpool, esp32spi
-            try:
-                res = self._sock_exact_recv(1)
-            except OSError as error:
-                if error.errno in (errno.ETIMEDOUT, errno.EAGAIN):
-                    # raised by a socket timeout if 0 bytes were present
-                    return None
-                raise MMQTTException from error
+            raise MMQTTException from error
 
         # Block while we parse the rest of the response
         self._sock.settimeout(timeout)
-        if res in [None, b"", bytearray(b'\x00')]:
+        if op == 0x00:
             # If we get here, it means that there is nothing to be received
             return None
-        if res[0] == MQTT_PINGRESP:
+        if op == MQTT_PINGRESP:
             if self.logger is not None:
                 self.logger.debug("Got PINGRESP")
             sz = self._sock_exact_recv(1)[0]
@@ -907,42 +1130,55 @@ class MQTT:
                 raise MMQTTException(
                     "Unexpected PINGRESP returned from broker: {}.".format(sz)
                 )
+            self._ping_sent = None
             return MQTT_PINGRESP
-        if res[0] & 0xF0 != 0x30:
-            return res[0]
+        if op == 0x40:
+            sz = self._sock_exact_recv(1)[0]
+            if sz != 0x02:
+                raise MMQTTException("Unexpected PUBACK length: {}.".format(sz))
+            rcv_pid = self._sock_exact_recv(2)
+            self._handle_puback(rcv_pid[0] << 0x08 | rcv_pid[1])
+            return 0x40
+        if op == 0x90:
+            # Packet identifier, then one return code per requested topic
+            sz = self._recv_len()
+            rc = self._sock_exact_recv(sz)
+            self._handle_suback(rc[0] << 0x08 | rc[1], bytes(rc[2:]))
+            return 0x90
+        if op & 0xF0 != 0x30:
+            return op
         sz = self._recv_len()
         # topic length MSB & LSB
         topic_len = self._sock_exact_recv(2)
         topic_len = (topic_len[0] << 8) | topic_len[1]
-        topic = self._sock_exact_recv(topic_len)
-        topic = str(topic, "utf-8")
+        # Decoded straight from the receive buffer before it is reused
+        topic = str(self._sock_exact_recv(topic_len), "utf-8")
         sz -= topic_len + 2
         pid = 0
-        if res[0] & 0x06:
+        if op & 0x06:
             pid = self._sock_exact_recv(2)
             pid = pid[0] << 0x08 | pid[1]
             sz -= 0x02
         # read message contents
         raw_msg = self._sock_exact_recv(sz)
-        msg = raw_msg if self._use_binary_mode else str(raw_msg, "utf-8")
+        msg = bytes(raw_msg) if self._use_binary_mode else str(raw_msg, "utf-8")
         if self.logger is not None:
             self.logger.debug(
                 "Receiving SUBSCRIBE \nTopic: %s\nMsg: %s\n", topic, raw_msg
             )
         self._handle_on_message(self, topic, msg)
-        if res[0] & 0x06 == 0x02:
+        if op & 0x06 == 0x02:
             pkt = bytearray(b"\x40\x02\0\0")
             struct.pack_into("!H", pkt, 2, pid)
             self._sock.send(pkt)
-        elif res[0] & 6 == 4:
+        elif op & 6 == 4:
             assert 0
-        return res[0]
+        return op
 
     def _recv_len(self):
         """Unpack MQTT message length."""
         n = 0
         sh = 0
-        b = bytearray(1)
         while True:
             b = self._sock_exact_recv(1)[0]
             n |= (b & 0x7F) << sh
@@ -960,68 +1196,142 @@ class MQTT:
             return read_size
         return self._sock.recv_into(buf, size)
 
+    def _is_timeout(self, error):
+        """Whether a socket error just means no data arrived before the timeout."""
+        # CPython socket module contains a timeout attribute
+        timeout = getattr(self._socket_pool, "timeout", None)
+        if timeout is not None and isinstance(error, timeout):
+            return True
+        return error.errno in (errno.ETIMEDOUT, errno.EAGAIN)
+
+    def _rx_fill(self, need):
+        """Pulls whatever the socket has waiting into the receive buffer with a
+        single read, making room for at least ``need`` unread bytes. Raises the
+        socket's timeout error if nothing arrived.
+
+        :param int need: number of unread bytes the caller requires
+
+        """
+        if self._rx_start == self._rx_end:
+            self._rx_start = self._rx_end = 0
+        elif len(self._rx_buf) - self._rx_start < need:
+            # Move the unread tail to the front of the buffer
+            pending = bytes(self._rx_view[self._rx_start : self._rx_end])
+            self._rx_end = len(pending)
+            self._rx_buf[: self._rx_end] = pending
+            self._rx_start = 0
+        read_size = self._recv_into(
+            self._rx_view[self._rx_end :], len(self._rx_buf) - self._rx_end
+        )
+        if not read_size:
+            if self.logger is not None:
+                self.logger.debug("_sock_exact_recv timeout")
+            # If no bytes waiting, raise same exception as socketpool
+            raise OSError(errno.ETIMEDOUT)
+        self._rx_end += read_size
+
     def _sock_exact_recv(self, bufsize):
-        """Reads _exact_ number of bytes from the connected socket. Will only return
-        string with the exact number of bytes requested.
+        """Reads _exact_ number of bytes from the connected socket.
 
-        The semantics of native socket receive is that it returns no more than the
-        specified number of bytes (i.e. max size). However, it makes no guarantees in
-        terms of the minimum size of the buffer, which could be 1 byte. This is a
-        wrapper for socket recv() to ensure that no less than the expected number of
-        bytes is returned or trigger a timeout exception.
+        Bytes are served from the receive buffer, which is refilled with one bulk
+        read whenever it runs short, so a whole packet usually arrives in a single
+        socket (SPI) transaction. The returned memoryview aliases the buffer and
+        is only valid until the next read. Payloads larger than the buffer are
+        returned as a new bytearray.
+
+        If no bytes are waiting, the socket timeout error is raised; once some
+        bytes have arrived, the rest are waited for up to keep_alive seconds.
 
         :param int bufsize: number of bytes to receive
 
         """
-        if not self._backwards_compatible_sock:
-            # CPython/Socketpool Impl.
-            rc = bytearray(bufsize)
-            self._sock.recv_into(rc, bufsize)
-        else:  # ESP32SPI Impl.
+        if bufsize > len(self._rx_buf):
+            return self._recv_large(bufsize)
+        if self._rx_end - self._rx_start < bufsize:
+            if self._rx_start == self._rx_end:
+                self._rx_fill(bufsize)
             stamp = time.monotonic()
-            read_timeout = self.keep_alive
-            # This will timeout with socket timeout (not keepalive timeout)
-            rc = self._sock.recv(bufsize)
-            if not rc:
-                if self.logger is not None:
-                    self.logger.debug("_sock_exact_recv timeout")
-                # If no bytes waiting, raise same exception as socketpool
-                raise OSError(errno.ETIMEDOUT)
-            # If any bytes waiting, try to read them all,
-            # or raise exception if wait longer than read_timeout
-            to_read = bufsize - len(rc)
-            assert to_read >= 0
-            read_timeout = self.keep_alive
-            while to_read > 0:
-                recv = self._sock.recv(to_read)
-                to_read -= len(recv)
-                rc += recv
-                if time.monotonic() - stamp > read_timeout:
+            while self._rx_end - self._rx_start < bufsize:
+                try:
+                    self._rx_fill(bufsize)
+                except OSError as error:
+                    if not self._is_timeout(error):
+                        raise
+                if time.monotonic() - stamp > self.keep_alive:
                     raise MMQTTException(
                         "Unable to receive {} bytes within {} seconds.".format(
-                            to_read, read_timeout
+                            bufsize - (self._rx_end - self._rx_start), self.keep_alive
                         )
                     )
+        start = self._rx_start
+        self._rx_start += bufsize
+        return self._rx_view[start : start + bufsize]
+
+    def _recv_large(self, bufsize):
+        """Reads a payload that does not fit in the receive buffer."""
+        rc = bytearray(bufsize)
+        view = memoryview(rc)
+        received = self._rx_end - self._rx_start
+        view[:received] = self._rx_view[self._rx_start : self._rx_end]
+        self._rx_start = self._rx_end = 0
+        stamp = time.monotonic()
+        while received < bufsize:
+            try:
+                received += self._recv_into(view[received:], bufsize - received)
+            except OSError as error:
+                if not self._is_timeout(error):
+                    raise
+            if time.monotonic() - stamp > self.keep_alive:
+                raise MMQTTException(
+                    "Unable to receive {} bytes within {} seconds.".format(
+                        bufsize - received, self.keep_alive
+                    )
+                )
         return rc
 
-    def _send_str(self, string):
-        """Encodes a string and sends it to a socket.
+    def _tx_packet(self, size):
+        """Returns the send buffer, or a new one if the packet will not fit."""
+        if size > len(self._tx_buf):
+            return bytearray(size)
+        return self._tx_buf
+
+    def _send_packet(self, buf, length):
+        """Writes the first ``length`` bytes of an assembled packet in one send."""
+        if buf is self._tx_buf:
+            self._sock.send(self._tx_view[:length])
+        elif length < len(buf):
+            self._sock.send(memoryview(buf)[:length])
+        else:
+            self._sock.send(buf)
 
-        :param str string: String to write to the socket.
+    @staticmethod
+    def _pack_remaining_length(buf, offset, length):
+        """Encodes the packet remaining length [2.2.3], returning the new offset."""
+        while True:
+            encoded_byte = length % 0x80
+            length = length // 0x80
+            # if there is more data to encode, set the top bit of the byte
+            if length > 0:
+                encoded_byte |= 0x80
+            buf[offset] = encoded_byte
+            offset += 1
+            if length == 0:
+                return offset
 
-        """
-        if isinstance(string, str):
-            self._sock.send(struct.pack("!H", len(string.encode("utf-8"))))
-            self._sock.send(str.encode(string, "utf-8"))
-        else:
-            self._sock.send(struct.pack("!H", len(string)))
-            self._sock.send(string)
+    @staticmethod
+    def _pack_str(buf, offset, data):
+        """Writes length-prefixed bytes into a packet, returning the new offset."""
+        size = len(data)
+        buf[offset] = size >> 8
+        buf[offset + 1] = size & 0xFF
+        buf[offset + 2 : offset + 2 + size] = data
+        return offset + 2 + size
 
     @staticmethod
     def _valid_topic(topic):
         """Validates if topic provided is proper MQTT topic format.
 
-        :param str topic: Topic identifier
+        :param str|bytes topic: Topic identifier
 
         """
         if topic is None:
@@ -1030,7 +1340,9 @@ class MQTT:
         if not topic:
             raise MMQTTException("Topic may not be empty.")
         # [MQTT-4.7.3-3]
-        if len(topic.encode("utf-8")) > MQTT_TOPIC_LENGTH_LIMIT:
+        if isinstance(topic, str):
+            topic = topic.encode("utf-8")
+        if len(topic) > MQTT_TOPIC_LENGTH_LIMIT:
             raise MMQTTException("Topic length is too large.")
 
     @staticmethod
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Convert a BDF font into the compact binary glyph format read by app.font.
+
+Only the glyphs the app actually draws are kept (clock/calendar digits and
+separators plus the splash screen text), so the device neither parses the
+text BDF at boot nor holds unused glyphs.
+
+    python scripts/build_font.py src/bitocra7.bdf src/bitocra7.bin
+
+File layout (little-endian):
+
+    header   4s magic "MPF1", B ascent, B descent, b bbox width, b bbox height,
+             b bbox dx, b bbox dy, H glyph count
+    index    per glyph, sorted by code point: H code, B width, B height,
+             b dx, b dy, b shift_x, pad, I offset of the glyph rows
+    rows     per glyph, `height` rows of ceil(width / 8) bytes, MSB first
+"""
+
+import argparse
+import struct
+import sys
+
+FONT_MAGIC = b"MPF1"
+HEADER_FORMAT = "<4sBBbbbbH"
+INDEX_FORMAT = "<HBBbbbxI"
+
+# Glyphs drawn by the themes and the splash screen
+DEFAULT_TEXT = (
+    "0123456789:/ "
+    "jinglemansweep"
+    "loading..."
+    "wifi"
+    "mqtt"
+    "themes"
+    "ntp"
+)
+
+
+def parse_bdf(path):
+    font = dict(ascent=0, descent=0, bbox=(0, 0, 0, 0), glyphs={})
+    glyph = None
+    with open(path, "r", encoding="latin-1") as f:
+        for line in f:
+            line = line.strip()
+            key = line.split(" ", 1)[0]
+            if key == "FONTBOUNDINGBOX":
+                font["bbox"] = tuple(int(v) for v in line.split()[1:5])
+            elif key == "FONT_ASCENT":
+                font["ascent"] = int(line.split()[1])
+            elif key == "FONT_DESCENT":
+                font["descent"] = int(line.split()[1])
+            elif key == "STARTCHAR":
+                glyph = dict(code=None, shift_x=0, bbx=None, rows=None)
+            elif glyph is None:
+                continue
+            elif key == "ENCODING":
+                glyph["code"] = int(line.split()[1])
+            elif key == "DWIDTH":
+                glyph["shift_x"] = int(line.split()[1])
+            elif key == "BBX":
+                glyph["bbx"] = tuple(int(v) for v in line.split()[1:5])
+            elif key == "BITMAP":
+                glyph["rows"] = []
+            elif key == "ENDCHAR":
+                font["glyphs"][glyph["code"]] = glyph
+                glyph = None
+            elif glyph["rows"] is not None:
+                glyph["rows"].append(bytes.fromhex(line))
+    return font
+
+
+def build(font, text):
+    codes = sorted(set(ord(c) for c in text) & set(font["glyphs"]))
+    index = bytearray()
+    rows = bytearray()
+    rows_offset = struct.calcsize(HEADER_FORMAT) + len(codes) * struct.calcsize(
+        INDEX_FORMAT
+    )
+    for code in codes:
+        glyph = font["glyphs"][code]
+        width, height, dx, dy = glyph["bbx"]
+        row_bytes = (width + 7) // 8
+        index += struct.pack(
+            INDEX_FORMAT,
+            code,
+            width,
+            height,
+            dx,
+            dy,
+            glyph["shift_x"],
+            rows_offset + len(rows),
+        )
+        for row in glyph["rows"][:height]:
+            rows += row[:row_bytes].ljust(row_bytes, b"\0")
+    header = struct.pack(
+        HEADER_FORMAT,
+        FONT_MAGIC,
+        font["ascent"],
+        font["descent"],
+        *font["bbox"],
+        len(codes),
+    )
+    return bytes(header + index + rows), codes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a binary glyph subset font")
+    parser.add_argument("source", help="BDF font to convert")
+    parser.add_argument("target", help="binary font to write")
+    parser.add_argument("--text", default=DEFAULT_TEXT, help="characters to keep")
+    args = parser.parse_args(argv)
+    font = parse_bdf(args.source)
+    data, codes = build(font, args.text)
+    missing = sorted(set(args.text) - set(chr(c) for c in codes))
+    with open(args.target, "wb") as f:
+        f.write(data)
+    print(
+        "Font > Built: {} -> {} | Glyphs={}/{} | Bytes={}".format(
+            args.source, args.target, len(codes), len(font["glyphs"]), len(data)
+        )
+    )
+    if missing:
+        print("Font > Missing glyphs: {}".format("".join(missing)), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
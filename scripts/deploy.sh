@@ -17,6 +17,11 @@ echo
 circup install -r "${base_dir}/requirements.txt"
 echo
 
+echo "Building binary font subset..."
+echo
+python "${base_dir}/scripts/build_font.py" "${base_dir}/src/bitocra7.bdf" "${base_dir}/src/bitocra7.bin"
+echo
+
 echo "Syncronising project source to destination device (${dest_dir})..."
 echo
 rsync -av "${base_dir}/src/" "${dest_dir}/"
@@ -0,0 +1,323 @@
+"""Per-theme tick and render benchmark on the host simulator.
+
+    python sim/bench.py --frames 5000
+    python sim/bench.py --themes mario_random --compare sim/results/abc1234.json
+    python sim/bench.py --themes mario_random mario_running --sprites disk ram ram_crop
+
+Each theme is driven through ``--frames`` tick()/render_group() cycles with
+a scripted clock (advanced by 1/fps per frame), a scripted entity timeline
+and periodic button presses. Tick and render timings, per-frame theme
+allocations (tracemalloc peak) and retained objects are printed and written
+as JSON (by default to ``sim/results/<commit>.json``) so runs can be
+compared across commits.
+
+``--sprites`` runs each theme once per sprite sheet loading mode. The host
+cannot time flash reads, so besides render time each run reports the RAM
+held by the sheet and how many pixels per refresh were read from an
+``OnDiskBitmap`` (each one a flash read on the device).
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "lib"))
+
+import simulator  # noqa: E402
+
+simulator.install()
+
+from run import THEMES, load_theme_classes  # noqa: E402
+from app.utils import SPRITES_MODES  # noqa: E402
+
+RESULTS_DIR = os.path.join(simulator.SIM_DIR, "results")
+EPOCH = 1667852400  # 2022-11-07 20:20:00 UTC, an evening "underground" scene
+
+# (frame, entity, state) changes applied during each run
+ENTITY_SCRIPT = (
+    (500, "time_rgb", "OFF"),
+    (560, "time_rgb", "ON"),
+    (1200, "date_rgb", "OFF"),
+    (1260, "date_rgb", "ON"),
+    (2000, "power", "OFF"),
+    (2060, "power", "ON"),
+)
+BUTTON_INTERVAL = 750
+
+
+class NullMQTT:
+    """Discards publishes and subscriptions so only theme cost is measured."""
+
+    def publish(self, *args, **kwargs):
+        pass
+
+    def subscribe(self, *args, **kwargs):
+        pass
+
+    def add_topic_callback(self, *args, **kwargs):
+        pass
+
+
+def git_revision():
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=simulator.BASE_DIR,
+                stderr=subprocess.DEVNULL,
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def summarise(values):
+    return dict(
+        mean=sum(values) / len(values) if values else 0.0,
+        p95=percentile(values, 95),
+        p99=percentile(values, 99),
+        max=max(values) if values else 0.0,
+    )
+
+
+# RAM taken by a sprite sheet bitmap, using CircuitPython's packing (bits per
+# value rounded up to a power of two, rows padded to 32-bit words)
+def bitmap_bytes(bitmap):
+    import displayio
+
+    if not isinstance(bitmap, displayio.Bitmap):
+        return 0
+    bits = 1
+    while (1 << bits) < bitmap.value_count:
+        bits *= 2
+    return ((bitmap.width * bits + 31) // 32) * 4 * bitmap.height
+
+
+def load_sprites(mode):
+    import app
+    from app.palettes import BrightnessPalette
+    from app.utils import load_sprites
+
+    bitmap, palette = load_sprites(
+        "/sprites.bmp", transparent_index=31, mode=mode, tile_count=app.SPRITES_TILES
+    )
+    return bitmap, BrightnessPalette(palette, brightness=app.SPRITES_BRIGHTNESS).palette
+
+
+def build_entities():
+    from app.hass import Light, Switch
+
+    mqtt = NullMQTT()
+    entities = {}
+    for name, EntityCls in (
+        ("power", Switch),
+        ("date_rgb", Light),
+        ("time_rgb", Light),
+    ):
+        device_class = EntityCls.__name__.lower()
+        entity = EntityCls("bench", name, device_class, "homeassistant", mqtt)
+        entity.update(dict(state="ON"))
+        entities[name] = entity
+    return entities
+
+
+async def bench_theme(theme_cls, frames, fps, trace, sprites="disk"):
+    import app
+    import displayio
+    from app.clock import time_service
+    from app.context import FrameContext
+    from displayio import Display, Group
+    from simulator import clock
+
+    clock.script(start=0.0, epoch=EPOCH)
+    time_service.reset()
+    random.seed(0)
+    display = Display()
+    display.auto_refresh = False
+    bitmap, palette = load_sprites(sprites)
+    theme = theme_cls(
+        display=display, bitmap=bitmap, palette=palette, font=app.font_bitocra
+    )
+    entities = build_entities()
+    ctx = FrameContext(entities)
+    group_blank = Group()
+    shown = None
+    script = list(ENTITY_SCRIPT)
+
+    gc.collect()
+    objects_before = len(gc.get_objects())
+    await theme.setup()
+    gc.collect()
+    objects_setup = len(gc.get_objects())
+
+    tick_times, render_times, alloc_bytes = [], [], []
+    refreshes = 0
+    displayio.stats["pixels"] = 0
+    displayio.stats["disk_pixels"] = 0
+    if trace:
+        tracemalloc.start()
+    for frame in range(frames):
+        while script and script[0][0] == frame:
+            _, name, value = script.pop(0)
+            entities[name].update(dict(state=value))
+        if frame and frame % BUTTON_INTERVAL == 0:
+            await theme.on_button()
+        if trace:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        time_service.update()
+        ctx.update(frame)
+        await theme.tick(ctx)
+        mid = time.perf_counter()
+        powered = ctx.power
+        group = await theme.render_group() if powered else group_blank
+        if trace:
+            # Theme-side allocations only; the simulated renderer's own numpy
+            # temporaries say nothing about the device
+            alloc_bytes.append(tracemalloc.get_traced_memory()[1] - base)
+        changed = group is not shown
+        if changed:
+            display.show(group)
+            shown = group
+        if changed or (powered and theme.dirty):
+            display.refresh(minimum_frames_per_second=0)
+            theme.dirty = False
+            refreshes += 1
+        end = time.perf_counter()
+        tick_times.append((mid - start) * 1000)
+        render_times.append((end - mid) * 1000)
+        clock.advance(1 / fps)
+    if trace:
+        tracemalloc.stop()
+
+    gc.collect()
+    objects_after = len(gc.get_objects())
+    clock.unscript()
+    return dict(
+        theme=theme_cls.__theme_name__,
+        sprites=sprites,
+        frames=frames,
+        tick_ms=summarise(tick_times),
+        render_ms=summarise(render_times),
+        refreshes=refreshes,
+        pixels_per_refresh=displayio.stats["pixels"] // max(1, refreshes),
+        disk_pixels_per_refresh=displayio.stats["disk_pixels"] // max(1, refreshes),
+        sprite_bytes=bitmap_bytes(bitmap),
+        alloc_bytes_per_frame=summarise(alloc_bytes) if trace else None,
+        objects_setup=objects_setup - objects_before,
+        objects_retained=objects_after - objects_setup,
+    )
+
+
+def print_result(result, previous=None):
+    def delta(section, key):
+        if not previous or not previous.get(section):
+            return ""
+        old = previous[section][key]
+        new = result[section][key]
+        if not old:
+            return ""
+        return " ({:+.0f}%)".format((new - old) / old * 100)
+
+    print(
+        "{} ({} frames, sprites={})".format(
+            result["theme"], result["frames"], result.get("sprites", "disk")
+        )
+    )
+    for section in ("tick_ms", "render_ms", "alloc_bytes_per_frame"):
+        values = result[section]
+        if values is None:
+            continue
+        print(
+            "  {:<22} mean={:.4f}{} p95={:.4f}{} p99={:.4f}{}".format(
+                section,
+                values["mean"],
+                delta(section, "mean"),
+                values["p95"],
+                delta(section, "p95"),
+                values["p99"],
+                delta(section, "p99"),
+            )
+        )
+    print(
+        "  refreshes={} pixels/refresh={} objects_setup={} objects_retained={}".format(
+            result["refreshes"],
+            result["pixels_per_refresh"],
+            result["objects_setup"],
+            result["objects_retained"],
+        )
+    )
+    print(
+        "  sprite_bytes={} disk_pixels/refresh={}".format(
+            result["sprite_bytes"], result["disk_pixels_per_refresh"]
+        )
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--themes", nargs="+", default=list(THEMES), choices=THEMES)
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument(
+        "--sprites",
+        nargs="+",
+        default=["disk"],
+        choices=SPRITES_MODES,
+        help="sprite sheet loading modes to compare",
+    )
+    parser.add_argument("--no-trace", action="store_true", help="skip allocation tracing")
+    parser.add_argument("--out", help="JSON output path (default sim/results/<commit>.json)")
+    parser.add_argument("--compare", help="previous JSON results to diff against")
+    args = parser.parse_args(argv)
+
+    previous = {}
+    if args.compare:
+        with open(args.compare) as f:
+            previous = {
+                (r["theme"], r.get("sprites", "disk")): r for r in json.load(f)["results"]
+            }
+
+    results = []
+    for theme_cls in load_theme_classes(args.themes):
+        for sprites in args.sprites:
+            result = asyncio.run(
+                bench_theme(
+                    theme_cls, args.frames, args.fps, not args.no_trace, sprites
+                )
+            )
+            results.append(result)
+            print_result(result, previous.get((result["theme"], sprites)))
+
+    revision = git_revision()
+    out = args.out or os.path.join(RESULTS_DIR, "{}.json".format(revision))
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(
+            dict(revision=revision, created=int(time.time()), fps=args.fps, results=results),
+            f,
+            indent=2,
+        )
+    print("Benchmark > Results written to {}".format(out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Simulated ``adafruit_bitmap_font.bitmap_font`` with a BDF parser."""
+
+from displayio import Bitmap
+from fontio import Glyph
+from simulator import resolve_path
+
+
+class BDF:
+    def __init__(self, path):
+        self.glyphs = {}
+        self.ascent = 0
+        self.descent = 0
+        self._bounding_box = (0, 0, 0, 0)
+        with open(path, "r", encoding="latin-1") as f:
+            self._parse(f)
+
+    def _parse(self, f):
+        code = None
+        bbx = None
+        shift_x = 0
+        rows = None
+        for line in f:
+            line = line.strip()
+            if line.startswith("FONTBOUNDINGBOX "):
+                self._bounding_box = tuple(int(v) for v in line.split()[1:5])
+            elif line.startswith("FONT_ASCENT "):
+                self.ascent = int(line.split()[1])
+            elif line.startswith("FONT_DESCENT "):
+                self.descent = int(line.split()[1])
+            elif line.startswith("ENCODING "):
+                code = int(line.split()[1])
+            elif line.startswith("DWIDTH "):
+                shift_x = int(line.split()[1])
+            elif line.startswith("BBX "):
+                bbx = tuple(int(v) for v in line.split()[1:5])
+            elif line == "BITMAP":
+                rows = []
+            elif line == "ENDCHAR":
+                self._add_glyph(code, bbx, shift_x, rows)
+                code, bbx, rows = None, None, None
+            elif rows is not None:
+                rows.append((int(line, 16), len(line) * 4))
+
+    def _add_glyph(self, code, bbx, shift_x, rows):
+        width, height, dx, dy = bbx
+        bitmap = Bitmap(width, height, 2)
+        for y, (row, row_bits) in enumerate(rows[:height]):
+            for x in range(width):
+                if row & (1 << (row_bits - 1 - x)):
+                    bitmap[x, y] = 1
+        self.glyphs[code] = Glyph(bitmap, 0, width, height, dx, dy, shift_x, 0)
+
+    def get_bounding_box(self):
+        return self._bounding_box
+
+    def load_glyphs(self, code_points):
+        pass
+
+    def get_glyph(self, code_point):
+        return self.glyphs.get(code_point)
+
+
+def load_font(filename, bitmap=None):
+    return BDF(resolve_path(filename))
@@ -0,0 +1,98 @@
+"""Simulated ``adafruit_display_text.label.Label``.
+
+Text is rasterised into a single two-colour Bitmap whenever ``text`` or
+``font`` change, matching the re-layout cost of the real library closely
+enough for profiling purposes.
+"""
+
+from displayio import Bitmap, Group, Palette, TileGrid
+
+
+class Label(Group):
+    def __init__(
+        self,
+        font,
+        *,
+        text="",
+        color=0xFFFFFF,
+        background_color=None,
+        x=0,
+        y=0,
+        scale=1,
+        **kwargs
+    ):
+        super().__init__(x=x, y=y, scale=scale)
+        self._font = font
+        self._palette = Palette(2)
+        self._palette.make_transparent(0)
+        self._palette[1] = color
+        self._color = color
+        self._background_color = background_color
+        self._text = None
+        self.layouts = 0
+        self.text = text
+
+    @property
+    def font(self):
+        return self._font
+
+    @font.setter
+    def font(self, font):
+        self._font = font
+        self._layout(self._text)
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, color):
+        self._color = color
+        self._palette[1] = color
+
+    @property
+    def background_color(self):
+        return self._background_color
+
+    @background_color.setter
+    def background_color(self, color):
+        self._background_color = color
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        if text == self._text:
+            return
+        self._text = text
+        self._layout(text)
+
+    def _layout(self, text):
+        self.layouts += 1
+        while len(self):
+            self.pop()
+        font = self._font
+        ascent = getattr(font, "ascent", 0) or font.get_bounding_box()[1]
+        descent = getattr(font, "descent", 0)
+        glyphs = [font.get_glyph(ord(c)) for c in text]
+        glyphs = [g for g in glyphs if g is not None]
+        width = max(1, sum(g.shift_x for g in glyphs))
+        height = max(1, ascent + descent)
+        bitmap = Bitmap(width, height, 2)
+        cursor = 0
+        for glyph in glyphs:
+            top = ascent - glyph.dy - glyph.height
+            for gy in range(glyph.height):
+                for gx in range(glyph.width):
+                    if glyph.bitmap[gx, gy]:
+                        px, py = cursor + glyph.dx + gx, top + gy
+                        if 0 <= px < width and 0 <= py < height:
+                            bitmap[px, py] = 1
+            cursor += glyph.shift_x
+        # Label y is the vertical centre of the text box
+        self.append(
+            TileGrid(bitmap, pixel_shader=self._palette, x=0, y=-(height // 2))
+        )
+        self.bounding_box = (0, -(height // 2), width, height)
@@ -0,0 +1,86 @@
+"""Simulated ESP32SPI socket module connected to ``simulator.broker``.
+
+Like the real co-processor socket, ``recv`` returns whatever is buffered (or
+``b""`` when nothing is waiting) and there is no ``recv_into``. Every
+``send`` and ``recv`` call is counted, as each one is an SPI transaction on
+the device.
+"""
+
+import errno
+
+from simulator.broker import broker
+
+AF_INET = 2
+SOCK_STREAM = 1
+TCP_MODE = 0
+
+# CircuitPython sets OSError(errno).errno, CPython only does so for the
+# two-argument form; exposing a ``timeout`` class makes minimqtt treat the
+# empty-read OSError(ETIMEDOUT) it raises as "no data" on the host too.
+timeout = OSError
+
+stats = dict(sends=0, recvs=0, empty_recvs=0, bytes_sent=0, bytes_received=0)
+
+_the_interface = None
+
+
+def set_interface(iface):
+    global _the_interface
+    _the_interface = iface
+
+
+def getaddrinfo(host, port, family=0, socktype=0, proto=0, flags=0):
+    return [(AF_INET, socktype, proto, "", (host, port))]
+
+
+class socket:
+    def __init__(self, family=AF_INET, type=SOCK_STREAM, proto=0, fileno=None):
+        self._timeout = 0
+        self._connected = False
+        self.rx = bytearray()
+        self.subscriptions = {}
+        self._inbox = bytearray()
+
+    def connect(self, address, conntype=None):
+        if not broker.online:
+            raise OSError(errno.ECONNREFUSED)
+        broker.attach(self)
+        self._connected = True
+
+    def drop(self):
+        """Break the connection from the broker side."""
+        self._connected = False
+
+    def deliver(self, data):
+        self._inbox.extend(data)
+
+    def send(self, data):
+        if not self._connected:
+            raise OSError("Socket not connected")
+        stats["sends"] += 1
+        stats["bytes_sent"] += len(data)
+        broker.receive(self, bytes(data))
+        return len(data)
+
+    def recv(self, bufsize=0):
+        if not self._connected:
+            raise OSError(errno.ENOTCONN)
+        stats["recvs"] += 1
+        if not self._inbox:
+            stats["empty_recvs"] += 1
+            return b""
+        size = len(self._inbox) if bufsize == 0 else bufsize
+        data = bytes(self._inbox[:size])
+        del self._inbox[:size]
+        stats["bytes_received"] += len(data)
+        return data
+
+    def available(self):
+        return len(self._inbox)
+
+    def settimeout(self, value):
+        self._timeout = value
+
+    def close(self):
+        self._connected = False
+        broker.detach(self)
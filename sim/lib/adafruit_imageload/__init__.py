@@ -0,0 +1,16 @@
+"""Simulated ``adafruit_imageload``, decoding indexed BMPs into RAM."""
+
+import displayio
+
+
+def load(file_or_filename, *, bitmap=None, palette=None):
+    source_palette, pixels = displayio._read_bmp(file_or_filename)
+    height, width = pixels.shape
+    bitmap_cls = bitmap or displayio.Bitmap
+    palette_cls = palette or displayio.Palette
+    image = bitmap_cls(width, height, len(source_palette))
+    image._data[:, :] = pixels
+    colors = palette_cls(len(source_palette))
+    for i in range(len(source_palette)):
+        colors[i] = source_palette[i]
+    return image, colors
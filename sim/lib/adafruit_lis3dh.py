@@ -0,0 +1,10 @@
+"""Simulated ``adafruit_lis3dh`` reporting a panel hanging upright."""
+
+from collections import namedtuple
+
+AccelerationTuple = namedtuple("acceleration", ("x", "y", "z"))
+
+
+class LIS3DH_I2C:
+    def __init__(self, i2c, *, address=0x18, int1=None, int2=None):
+        self.acceleration = AccelerationTuple(0.0, 9.806, 0.0)
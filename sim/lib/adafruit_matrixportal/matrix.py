@@ -0,0 +1,20 @@
+"""Simulated ``adafruit_matrixportal.matrix.Matrix``."""
+
+from displayio import Display
+
+
+class Matrix:
+    def __init__(
+        self,
+        *,
+        width=64,
+        height=32,
+        bit_depth=2,
+        alt_addr_pins=None,
+        color_order="RGB",
+        serpentine=True,
+        tile_rows=1,
+        rotation=0
+    ):
+        self.display = Display(width=width, height=height * tile_rows)
+        self.display.rotation = rotation
@@ -0,0 +1,40 @@
+"""Simulated ``adafruit_matrixportal.network.Network``."""
+
+import time
+
+from simulator import clock
+
+
+class _ESP:
+    TLS_MODE = 2
+    MAC_address = bytes((0x5A, 0x1A, 0x70, 0x01, 0x00, 0x00))
+
+
+class _WiFi:
+    def __init__(self):
+        self.esp = _ESP()
+
+
+class Network:
+    def __init__(self, *, status_neopixel=None, esp=None, external_spi=None, debug=False):
+        self.debug = debug
+        self._wifi = _WiFi()
+        self.connected = False
+
+    @property
+    def is_connected(self):
+        return self.connected
+
+    def connect(self, max_attempts=10):
+        self.connected = True
+
+    def get_local_time(self, location=None):
+        now = clock.now()
+        stamp = time.localtime(now)
+        return "{} {:03d} {} {} UTC".format(
+            time.strftime("%Y-%m-%d %H:%M:%S", stamp)
+            + ".{:03d}".format(int(now * 1000) % 1000),
+            stamp.tm_yday,
+            stamp.tm_wday,
+            "+0000",
+        )
@@ -0,0 +1,34 @@
+"""Simulated ``adafruit_minimqtt.matcher``.
+
+This directory deliberately has no ``__init__.py``: together with
+``patch/lib/adafruit_minimqtt`` it forms a namespace package, so the patched
+client runs unmodified on top of this matcher.
+"""
+
+from simulator.broker import topic_matches
+
+
+class MQTTMatcher:
+    def __init__(self):
+        self._exact = {}
+        self._wildcards = {}
+
+    def _table(self, key):
+        return self._wildcards if "+" in key or "#" in key else self._exact
+
+    def __setitem__(self, key, value):
+        self._table(key)[key] = value
+
+    def __getitem__(self, key):
+        return self._table(key)[key]
+
+    def __delitem__(self, key):
+        del self._table(key)[key]
+
+    def iter_match(self, topic):
+        callback = self._exact.get(topic)
+        if callback is not None:
+            yield callback
+        for pattern, callback in list(self._wildcards.items()):
+            if topic_matches(pattern, topic):
+                yield callback
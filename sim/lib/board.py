@@ -0,0 +1,7 @@
+"""Simulated ``board`` pin names for the Matrix Portal M4."""
+
+SCL = "SCL"
+SDA = "SDA"
+NEOPIXEL = "NEOPIXEL"
+BUTTON_UP = "BUTTON_UP"
+BUTTON_DOWN = "BUTTON_DOWN"
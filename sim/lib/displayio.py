@@ -0,0 +1,320 @@
+"""Simulated ``displayio`` rendering into a NumPy RGB framebuffer.
+
+Implements the parts of the CircuitPython API used by the app: Group,
+TileGrid, Bitmap, Palette, OnDiskBitmap and a framebuffer-backed display.
+Pixel formats are always RGB888; colour conversion and dithering are not
+simulated.
+"""
+
+import struct
+
+import numpy as np
+
+from simulator import resolve_path
+
+stats = dict(refreshes=0, shows=0, pixels=0, disk_pixels=0)
+
+
+def release_displays():
+    pass
+
+
+class Bitmap:
+    def __init__(self, width, height, value_count):
+        self.width = width
+        self.height = height
+        self.value_count = value_count
+        self._data = np.zeros((height, width), dtype=np.uint16)
+
+    def _xy(self, index):
+        if isinstance(index, tuple):
+            return index
+        return index % self.width, index // self.width
+
+    def __getitem__(self, index):
+        x, y = self._xy(index)
+        return int(self._data[y, x])
+
+    def __setitem__(self, index, value):
+        x, y = self._xy(index)
+        if value >= self.value_count:
+            raise ValueError("value out of range for bitmap")
+        self._data[y, x] = value
+
+    def __len__(self):
+        return self.width * self.height
+
+    def fill(self, value):
+        self._data[:, :] = value
+
+    def blit(self, x, y, source, *, x1=0, y1=0, x2=None, y2=None, skip_index=None):
+        x2 = source.width if x2 is None else x2
+        y2 = source.height if y2 is None else y2
+        region = source._data[y1:y2, x1:x2]
+        target = self._data[y : y + region.shape[0], x : x + region.shape[1]]
+        region = region[: target.shape[0], : target.shape[1]]
+        if skip_index is None:
+            target[:, :] = region
+        else:
+            mask = region != skip_index
+            target[mask] = region[mask]
+
+
+class Palette:
+    def __init__(self, color_count, *, dither=False):
+        self._colors = [0] * color_count
+        self._transparent = [False] * color_count
+        self._rgb = None
+
+    @staticmethod
+    def _to_int(color):
+        if isinstance(color, (tuple, list)):
+            return (color[0] << 16) | (color[1] << 8) | color[2]
+        if isinstance(color, (bytes, bytearray)):
+            return (color[0] << 16) | (color[1] << 8) | color[2]
+        return int(color) & 0xFFFFFF
+
+    def __len__(self):
+        return len(self._colors)
+
+    def __getitem__(self, index):
+        if index >= len(self._colors):
+            raise IndexError("palette index out of range")
+        return self._colors[index]
+
+    def __setitem__(self, index, color):
+        self._colors[index] = self._to_int(color)
+        self._rgb = None
+
+    def make_transparent(self, index):
+        self._transparent[index] = True
+        self._rgb = None
+
+    def make_opaque(self, index):
+        self._transparent[index] = False
+        self._rgb = None
+
+    def is_transparent(self, index):
+        return self._transparent[index]
+
+    def _lookup(self):
+        # Cached (rgb, opaque) arrays for vectorised rendering
+        if self._rgb is None:
+            colors = np.array(self._colors, dtype=np.uint32)
+            rgb = np.stack(
+                ((colors >> 16) & 0xFF, (colors >> 8) & 0xFF, colors & 0xFF), axis=1
+            ).astype(np.uint8)
+            self._rgb = (rgb, ~np.array(self._transparent, dtype=bool))
+        return self._rgb
+
+
+def _read_bmp(file):
+    """Decode an indexed (1/4/8-bit) BMP into (palette, pixels)."""
+    path = file if not isinstance(file, str) else resolve_path(file)
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:2] != b"BM":
+        raise ValueError("Invalid BMP file")
+    offset = struct.unpack_from("<I", data, 10)[0]
+    header_size = struct.unpack_from("<I", data, 14)[0]
+    width, height = struct.unpack_from("<ii", data, 18)
+    bpp = struct.unpack_from("<H", data, 28)[0]
+    colors_used = struct.unpack_from("<I", data, 46)[0] or (1 << bpp)
+    if bpp > 8:
+        raise NotImplementedError("Only indexed BMPs are simulated")
+    palette = Palette(colors_used)
+    palette_offset = 14 + header_size
+    for i in range(colors_used):
+        b, g, r = data[palette_offset + i * 4 : palette_offset + i * 4 + 3]
+        palette[i] = (r, g, b)
+    rows_count = abs(height)
+    stride = ((width * bpp + 31) // 32) * 4
+    rows = np.frombuffer(data, dtype=np.uint8, count=stride * rows_count, offset=offset)
+    rows = rows.reshape(rows_count, stride)
+    if bpp < 8:
+        rows = np.unpackbits(rows, axis=1).reshape(rows_count, -1, bpp)
+        rows = rows.dot(1 << np.arange(bpp - 1, -1, -1))
+    pixels = rows[:, :width].astype(np.uint16)
+    if height > 0:
+        pixels = pixels[::-1]
+    return palette, np.ascontiguousarray(pixels)
+
+
+class OnDiskBitmap:
+    """Indexed BMP read from the simulated CIRCUITPY filesystem.
+
+    On the device every pixel drawn from an OnDiskBitmap is read back from
+    flash, so pixels sourced from one are counted in ``stats["disk_pixels"]``.
+    """
+
+    def __init__(self, file):
+        self.pixel_shader, self._data = _read_bmp(file)
+        self.height, self.width = self._data.shape
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            x, y = index
+        else:
+            x, y = index % self.width, index // self.width
+        return int(self._data[y, x])
+
+
+class _Layer:
+    def __init__(self, x=0, y=0):
+        self.x = x
+        self.y = y
+        self.hidden = False
+        self._parent = None
+
+
+class TileGrid(_Layer):
+    def __init__(
+        self,
+        bitmap,
+        *,
+        pixel_shader,
+        width=1,
+        height=1,
+        tile_width=None,
+        tile_height=None,
+        default_tile=0,
+        x=0,
+        y=0,
+    ):
+        super().__init__(x, y)
+        self.bitmap = bitmap
+        self.pixel_shader = pixel_shader
+        self.width = width
+        self.height = height
+        self.tile_width = bitmap.width if tile_width is None else tile_width
+        self.tile_height = bitmap.height if tile_height is None else tile_height
+        self.flip_x = False
+        self.flip_y = False
+        self.transpose_xy = False
+        self._tiles = [default_tile] * (width * height)
+
+    def _index(self, index):
+        if isinstance(index, tuple):
+            x, y = index
+            return y * self.width + x
+        return index
+
+    def __getitem__(self, index):
+        return self._tiles[self._index(index)]
+
+    def __setitem__(self, index, value):
+        self._tiles[self._index(index)] = value
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def _render(self, fb, ox, oy):
+        if self.hidden:
+            return
+        rgb, opaque = self.pixel_shader._lookup()
+        source = self.bitmap._data
+        tiles_per_row = self.bitmap.width // self.tile_width
+        fb_h, fb_w = fb.shape[:2]
+        tw, th = self.tile_width, self.tile_height
+        for ty in range(self.height):
+            for tx in range(self.width):
+                tile = self._tiles[ty * self.width + tx]
+                sx = (tile % tiles_per_row) * tw
+                sy = (tile // tiles_per_row) * th
+                dx = ox + self.x + tx * tw
+                dy = oy + self.y + ty * th
+                x0, y0 = max(dx, 0), max(dy, 0)
+                x1, y1 = min(dx + tw, fb_w), min(dy + th, fb_h)
+                if x0 >= x1 or y0 >= y1:
+                    continue
+                pixels = source[sy + y0 - dy : sy + y1 - dy, sx + x0 - dx : sx + x1 - dx]
+                if self.flip_x:
+                    pixels = pixels[:, ::-1]
+                if self.flip_y:
+                    pixels = pixels[::-1]
+                if isinstance(self.bitmap, OnDiskBitmap):
+                    stats["disk_pixels"] += pixels.size
+                mask = opaque[pixels]
+                fb[y0:y1, x0:x1][mask] = rgb[pixels][mask]
+                stats["pixels"] += int(mask.sum())
+
+
+class Group(_Layer):
+    def __init__(self, *, scale=1, x=0, y=0):
+        super().__init__(x, y)
+        self.scale = scale
+        self._layers = []
+
+    def _adopt(self, layer):
+        if layer._parent is not None:
+            raise ValueError("Layer already in a group")
+        layer._parent = self
+        return layer
+
+    def append(self, layer):
+        self._layers.append(self._adopt(layer))
+
+    def insert(self, index, layer):
+        self._layers.insert(index, self._adopt(layer))
+
+    def index(self, layer):
+        return self._layers.index(layer)
+
+    def pop(self, index=-1):
+        layer = self._layers.pop(index)
+        layer._parent = None
+        return layer
+
+    def remove(self, layer):
+        self.pop(self._layers.index(layer))
+
+    def __len__(self):
+        return len(self._layers)
+
+    def __getitem__(self, index):
+        return self._layers[index]
+
+    def __setitem__(self, index, layer):
+        old = self._layers[index]
+        if old is layer:
+            return
+        self._adopt(layer)
+        old._parent = None
+        self._layers[index] = layer
+
+    def __delitem__(self, index):
+        self.pop(index)
+
+    def __iter__(self):
+        return iter(self._layers)
+
+    def _render(self, fb, ox, oy):
+        if self.hidden:
+            return
+        for layer in self._layers:
+            layer._render(fb, ox + self.x, oy + self.y)
+
+
+class Display:
+    """Framebuffer display as exposed by ``Matrix.display``."""
+
+    def __init__(self, width=64, height=32):
+        self.width = width
+        self.height = height
+        self.rotation = 0
+        self.auto_refresh = True
+        self.root_group = None
+        self.framebuffer = np.zeros((height, width, 3), dtype=np.uint8)
+
+    def show(self, group):
+        stats["shows"] += 1
+        self.root_group = group
+        if self.auto_refresh:
+            self.refresh()
+
+    def refresh(self, *, target_frames_per_second=None, minimum_frames_per_second=0):
+        stats["refreshes"] += 1
+        self.framebuffer[:, :, :] = 0
+        if self.root_group is not None:
+            self.root_group._render(self.framebuffer, 0, 0)
+        return True
@@ -0,0 +1,39 @@
+"""Simulated ``keypad`` fed from ``simulator.buttons``."""
+
+from simulator import buttons
+
+
+class Event:
+    def __init__(self, key_number=0, pressed=True):
+        self.key_number = key_number
+        self.pressed = pressed
+        self.released = not pressed
+
+
+class EventQueue:
+    def get(self):
+        if not buttons.events:
+            return None
+        key_number, pressed = buttons.events.pop(0)
+        return Event(key_number, pressed)
+
+    def clear(self):
+        buttons.events.clear()
+
+    def __len__(self):
+        return len(buttons.events)
+
+
+class Keys:
+    def __init__(self, pins, *, value_when_pressed, pull=True, **kwargs):
+        self.key_count = len(pins)
+        self.events = EventQueue()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.deinit()
+
+    def deinit(self):
+        pass
@@ -0,0 +1,29 @@
+"""Simulated ``microcontroller`` module with an in-memory NVM region."""
+
+import os
+
+NVM_SIZE = 8192
+NVM_PATH = os.environ.get("SIM_NVM")
+
+
+class NVM(bytearray):
+    """Byte array that is written through to ``SIM_NVM`` when set, so cached
+    state survives between simulator runs like it does across reboots."""
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        if NVM_PATH:
+            with open(NVM_PATH, "wb") as f:
+                f.write(self)
+
+
+def _load():
+    data = bytearray(b"\xff" * NVM_SIZE)
+    if NVM_PATH and os.path.exists(NVM_PATH):
+        with open(NVM_PATH, "rb") as f:
+            stored = f.read(NVM_SIZE)
+        data[: len(stored)] = stored
+    return NVM(data)
+
+
+nvm = _load()
@@ -0,0 +1,5 @@
+"""Simulated ``micropython`` module."""
+
+
+def const(value):
+    return value
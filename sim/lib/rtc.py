@@ -0,0 +1,13 @@
+"""Simulated ``rtc`` backed by the simulator clock."""
+
+from simulator import clock
+
+
+class RTC:
+    @property
+    def datetime(self):
+        return clock.localtime()
+
+    @datetime.setter
+    def datetime(self, value):
+        clock.set_localtime(value)
@@ -0,0 +1,14 @@
+"""Simulator ``secrets``; the in-memory broker accepts any credentials."""
+
+secrets = {
+    "ssid": "simulator",
+    "password": "simulator",
+    "mqtt_broker": "localhost",
+    "mqtt_port": 1883,
+    "mqtt_user": "simulator",
+    "mqtt_password": "simulator",
+    "matrix_bit_depth": 6,
+    "matrix_color_order": "RGB",
+    "ntp_enable": False,
+    "debug": False,
+}
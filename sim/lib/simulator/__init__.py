@@ -0,0 +1,76 @@
+"""Host-side simulation support for running the Matrix Portal app on CPython.
+
+The modules alongside this package (``displayio``, ``board``, ``rtc``,
+``keypad`` etc.) stand in for the CircuitPython builtins and libraries the
+app imports. This package holds the shared simulator state they use: the
+virtual filesystem root, the scripted clock, the in-memory MQTT broker and
+the injected button queue.
+"""
+
+import builtins
+import gc
+import os
+import sys
+import tracemalloc
+
+SIM_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BASE_DIR = os.path.dirname(SIM_DIR)
+LIB_DIR = os.path.join(SIM_DIR, "lib")
+PATCH_LIB_DIR = os.path.join(BASE_DIR, "patch", "lib")
+SRC_DIR = os.path.join(BASE_DIR, "src")
+
+# Root of the simulated CIRCUITPY filesystem ("/sprites.bmp" etc.)
+fs_root = SRC_DIR
+
+# Heap reported by gc.mem_free(); CPython objects are far larger than their
+# CircuitPython equivalents, so this is a budget for comparisons, not the M4's
+heap_size = 4 * 1024 * 1024
+
+
+def mem_alloc():
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    return 0
+
+
+def mem_free():
+    return max(0, heap_size - mem_alloc())
+
+
+def install():
+    """Put the simulated modules, patched libraries and app source on sys.path.
+
+    The stand-ins must shadow same-named stdlib modules (``secrets``), so they
+    go first; ``src`` goes last so ``code.py`` does not shadow stdlib ``code``.
+    """
+    for path in (PATCH_LIB_DIR, LIB_DIR):
+        if path in sys.path:
+            sys.path.remove(path)
+        sys.path.insert(0, path)
+    if SRC_DIR not in sys.path:
+        sys.path.append(SRC_DIR)
+    builtins.open = _open
+    gc.mem_free = mem_free
+    gc.mem_alloc = mem_alloc
+    stdlib_secrets = sys.modules.get("secrets")
+    if stdlib_secrets is not None and not hasattr(stdlib_secrets, "secrets"):
+        del sys.modules["secrets"]
+
+
+_host_open = builtins.open
+
+
+def _open(file, *args, **kwargs):
+    # App code opens files by absolute CIRCUITPY path ("/bitocra7.bin")
+    if isinstance(file, str) and file.startswith("/") and not os.path.exists(file):
+        resolved = resolve_path(file)
+        if os.path.exists(resolved):
+            file = resolved
+    return _host_open(file, *args, **kwargs)
+
+
+def resolve_path(path):
+    """Map an absolute CIRCUITPY path onto the host filesystem."""
+    if path.startswith("/"):
+        return os.path.join(fs_root, path.lstrip("/"))
+    return path
@@ -0,0 +1,227 @@
+"""In-memory MQTT 3.1.1 broker for the simulated ESP32SPI socket.
+
+Only the subset of the protocol used by minimqtt is implemented: CONNECT,
+PUBLISH (QoS 0/1, retained), PUBACK, SUBSCRIBE, UNSUBSCRIBE, PINGREQ and
+DISCONNECT. Responses are queued on the client socket synchronously, as soon
+as a complete packet has been sent.
+"""
+
+
+def topic_matches(pattern, topic):
+    pattern_parts = pattern.split("/")
+    topic_parts = topic.split("/")
+    for idx, part in enumerate(pattern_parts):
+        if part == "#":
+            return True
+        if idx >= len(topic_parts):
+            return False
+        if part != "+" and part != topic_parts[idx]:
+            return False
+    return len(pattern_parts) == len(topic_parts)
+
+
+def encode_length(length):
+    encoded = bytearray()
+    while True:
+        byte = length % 0x80
+        length //= 0x80
+        if length > 0:
+            byte |= 0x80
+        encoded.append(byte)
+        if length == 0:
+            return bytes(encoded)
+
+
+def encode_publish(topic, payload, qos=0, retain=False, pid=0):
+    topic = topic.encode("utf-8")
+    body = len(topic).to_bytes(2, "big") + topic
+    if qos:
+        body += pid.to_bytes(2, "big")
+    body += payload
+    return bytes([0x30 | qos << 1 | int(retain)]) + encode_length(len(body)) + body
+
+
+class Broker:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.clients = []
+        self.retained = {}
+        self.published = []  # (topic, payload, qos, retain) in arrival order
+        self.packets = []  # (client, packet type) in arrival order
+        self.pid = 0
+        self.drop_acks = False  # simulate a broker that never acknowledges
+        self.held_connacks = None  # list to queue CONNACKs in, for a slow broker
+        self.online = True
+
+    def go_offline(self):
+        """Drop every client connection and refuse new ones."""
+        self.online = False
+        for client in list(self.clients):
+            client.drop()
+        self.clients = []
+
+    def go_online(self):
+        self.online = True
+
+    def release_connacks(self):
+        """Send the CONNACKs queued while `held_connacks` was set."""
+        held, self.held_connacks = self.held_connacks or [], None
+        for client in held:
+            if client in self.clients:
+                client.deliver(b"\x20\x02\x00\x00")
+
+    def attach(self, client):
+        self.clients.append(client)
+        client.subscriptions = {}
+        client.rx = bytearray()
+
+    def detach(self, client):
+        if client in self.clients:
+            self.clients.remove(client)
+
+    def inject(self, topic, payload, retain=False):
+        """Publish a message from outside the device (e.g. Home Assistant)."""
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        self._route(topic, payload, retain)
+
+    def receive(self, client, data):
+        client.rx.extend(data)
+        while True:
+            packet = self._take_packet(client.rx)
+            if packet is None:
+                return
+            self._handle(client, *packet)
+
+    @staticmethod
+    def _take_packet(buf):
+        if len(buf) < 2:
+            return None
+        length = 0
+        shift = 0
+        idx = 1
+        while True:
+            if idx >= len(buf):
+                return None
+            byte = buf[idx]
+            length |= (byte & 0x7F) << shift
+            idx += 1
+            if not byte & 0x80:
+                break
+            shift += 7
+        if len(buf) < idx + length:
+            return None
+        header = buf[0]
+        body = bytes(buf[idx : idx + length])
+        del buf[: idx + length]
+        return header, body
+
+    def _handle(self, client, header, body):
+        kind = header & 0xF0
+        self.packets.append((client, kind))
+        if kind == 0x10:  # CONNECT
+            error = self._check_connect(body)
+            if error is not None:
+                # A real broker closes the connection on a malformed CONNECT
+                print(f"Broker > Malformed CONNECT: {error} | Packet={body.hex()}")
+                self.detach(client)
+                client.drop()
+                return
+            if self.held_connacks is not None:
+                self.held_connacks.append(client)
+                return
+            client.deliver(b"\x20\x02\x00\x00")
+        elif kind == 0x30:  # PUBLISH
+            qos = (header >> 1) & 0x03
+            retain = bool(header & 0x01)
+            topic_len = int.from_bytes(body[0:2], "big")
+            topic = body[2 : 2 + topic_len].decode("utf-8")
+            offset = 2 + topic_len
+            pid = 0
+            if qos:
+                pid = int.from_bytes(body[offset : offset + 2], "big")
+                offset += 2
+            payload = body[offset:]
+            self.published.append((topic, payload, qos, retain))
+            if qos == 1 and not self.drop_acks:
+                client.deliver(b"\x40\x02" + pid.to_bytes(2, "big"))
+            self._route(topic, payload, retain)
+        elif kind == 0x40:  # PUBACK (for messages we delivered at QoS 1)
+            pass
+        elif kind == 0x80:  # SUBSCRIBE
+            pid = body[0:2]
+            offset = 2
+            granted = bytearray()
+            topics = []
+            while offset < len(body):
+                topic_len = int.from_bytes(body[offset : offset + 2], "big")
+                topic = body[offset + 2 : offset + 2 + topic_len].decode("utf-8")
+                qos = body[offset + 2 + topic_len]
+                offset += 3 + topic_len
+                client.subscriptions[topic] = qos
+                granted.append(qos)
+                topics.append(topic)
+            if not self.drop_acks:
+                client.deliver(
+                    b"\x90" + encode_length(2 + len(granted)) + pid + bytes(granted)
+                )
+            for topic, payload in list(self.retained.items()):
+                if any(topic_matches(pattern, topic) for pattern in topics):
+                    client.deliver(encode_publish(topic, payload, retain=True))
+        elif kind == 0xA0:  # UNSUBSCRIBE
+            pid = body[0:2]
+            offset = 2
+            while offset < len(body):
+                topic_len = int.from_bytes(body[offset : offset + 2], "big")
+                topic = body[offset + 2 : offset + 2 + topic_len].decode("utf-8")
+                offset += 2 + topic_len
+                client.subscriptions.pop(topic, None)
+            client.deliver(b"\xb0\x02" + pid)
+        elif kind == 0xC0:  # PINGREQ
+            if not self.drop_acks:
+                client.deliver(b"\xd0\x00")
+        elif kind == 0xE0:  # DISCONNECT
+            self.detach(client)
+
+    @staticmethod
+    def _check_connect(body):
+        """Validate a CONNECT variable header and payload [MQTT-3.1]."""
+        if len(body) < 10 or body[0:6] != b"\x00\x04MQTT":
+            return "bad protocol name"
+        if body[6] != 0x04:
+            return "bad protocol level"
+        flags = body[7]
+        if flags & 0x01:
+            return "reserved flag set"
+        if flags & 0x40 and not flags & 0x80:
+            return "password without username"
+        fields = 1  # client id
+        if flags & 0x04:
+            fields += 2  # will topic and message
+        if flags & 0x80:
+            fields += 1
+        if flags & 0x40:
+            fields += 1
+        offset = 10  # after the 2 byte keep alive
+        for _ in range(fields):
+            if offset + 2 > len(body):
+                return "truncated payload"
+            offset += 2 + int.from_bytes(body[offset : offset + 2], "big")
+        if offset != len(body):
+            return "payload length mismatch"
+        return None
+
+    def _route(self, topic, payload, retain):
+        if retain:
+            if payload:
+                self.retained[topic] = payload
+            else:
+                self.retained.pop(topic, None)
+        for client in self.clients:
+            if any(topic_matches(p, topic) for p in client.subscriptions):
+                client.deliver(encode_publish(topic, payload))
+
+
+broker = Broker()
@@ -0,0 +1,8 @@
+"""Queue of simulated hardware button presses consumed by ``keypad.Keys``."""
+
+events = []
+
+
+def press(key_number):
+    events.append((key_number, True))
+    events.append((key_number, False))
@@ -0,0 +1,63 @@
+"""Simulated wall and monotonic clock.
+
+By default the clock follows the host's real time. Calling ``script()``
+freezes it so that benchmarks and regression runs can advance time
+deterministically with ``advance()``; ``time.monotonic`` is redirected to the
+simulated clock while scripted so app code sees the same timeline.
+"""
+
+import time
+
+_real_monotonic = time.monotonic
+_real_time = time.time
+
+_scripted = False
+_monotonic = 0.0
+_epoch_offset = 0.0
+
+
+def monotonic():
+    if _scripted:
+        return _monotonic
+    return _real_monotonic()
+
+
+def now():
+    """Seconds since the epoch on the simulated wall clock."""
+    return monotonic() + _epoch_offset
+
+
+def localtime():
+    return time.localtime(now())
+
+
+def set_localtime(struct_time):
+    global _epoch_offset
+    _epoch_offset = time.mktime(tuple(struct_time)) - monotonic()
+
+
+def script(start=None, epoch=None):
+    """Freeze the clock at ``start`` monotonic seconds and ``epoch`` wall time."""
+    global _scripted, _monotonic, _epoch_offset
+    _scripted = True
+    _monotonic = float(start or 0.0)
+    _epoch_offset = (_real_time() if epoch is None else epoch) - _monotonic
+    time.monotonic = monotonic
+
+
+def unscript():
+    global _scripted, _epoch_offset
+    wall = now()
+    _scripted = False
+    _epoch_offset = wall - _real_monotonic()
+    time.monotonic = _real_monotonic
+
+
+def advance(seconds):
+    global _monotonic
+    if not _scripted:
+        raise RuntimeError("Clock must be scripted before it can be advanced")
+    _monotonic += seconds
+
+
+_epoch_offset = _real_time() - _real_monotonic()
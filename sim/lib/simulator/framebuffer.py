@@ -0,0 +1,22 @@
+"""Helpers for inspecting the simulated 64x32 RGB framebuffer."""
+
+import numpy as np
+
+SHADES = " .:-=+*#%@"
+
+
+def save_ppm(path, framebuffer, scale=8):
+    """Write the framebuffer as a binary PPM, scaled up for viewing."""
+    image = np.repeat(np.repeat(framebuffer, scale, axis=0), scale, axis=1)
+    height, width = image.shape[:2]
+    with open(path, "wb") as f:
+        f.write("P6 {} {} 255\n".format(width, height).encode("ascii"))
+        f.write(np.ascontiguousarray(image, dtype=np.uint8).tobytes())
+
+
+def to_ascii(framebuffer):
+    """Render the framebuffer as text, one character per pixel."""
+    luma = framebuffer.max(axis=2).astype(np.int32)
+    peak = max(int(luma.max()), 1)
+    levels = (luma * (len(SHADES) - 1) + peak - 1) // peak
+    return "\n".join("".join(SHADES[v] for v in row) for row in levels)
@@ -0,0 +1,72 @@
+"""Run the Matrix Portal app headless on a Linux host.
+
+    python sim/run.py --themes mario_random mario_running --seconds 10 --ascii
+    python sim/run.py --themes simple --ppm /tmp/frame.ppm
+
+The CircuitPython modules are replaced by the stand-ins in ``sim/lib`` and
+the display renders into a 64x32 NumPy RGB framebuffer.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "lib"))
+
+import simulator  # noqa: E402
+
+simulator.install()
+
+THEMES = {
+    "mario_random": ("app.themes.mario_random", "MarioRandomTheme"),
+    "mario_running": ("app.themes.mario_running", "MarioRunningTheme"),
+    "simple": ("app.themes.simple", "SimpleTheme"),
+}
+
+
+def load_theme_classes(names):
+    classes = []
+    for name in names:
+        module_name, class_name = THEMES[name]
+        module = __import__(module_name, fromlist=[class_name])
+        classes.append(getattr(module, class_name))
+    return classes
+
+
+async def run_for(manager, seconds):
+    try:
+        await asyncio.wait_for(manager.loop(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--themes", nargs="+", default=list(THEMES), choices=THEMES)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--ppm", help="write the final frame to this PPM file")
+    parser.add_argument("--ascii", action="store_true", help="print the final frame")
+    args = parser.parse_args(argv)
+
+    import displayio
+    from app import Manager
+    from simulator.framebuffer import save_ppm, to_ascii
+
+    manager = Manager(themes=load_theme_classes(args.themes))
+    asyncio.run(run_for(manager, args.seconds))
+    display = manager.display
+    display.refresh()
+    print(
+        "Simulator > Frames={} | Stats={}".format(
+            manager.state["frame"], displayio.stats
+        )
+    )
+    if args.ppm:
+        save_ppm(args.ppm, display.framebuffer)
+    if args.ascii:
+        print(to_ascii(display.framebuffer))
+
+
+if __name__ == "__main__":
+    main()
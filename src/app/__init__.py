@@ -2,21 +2,33 @@ import asyncio
 import board
 from busio import I2C
 import gc
-import json
+import time
 from keypad import Keys
+from microcontroller import nvm
 import adafruit_esp32spi.adafruit_esp32spi_socket as socket
 import adafruit_minimqtt.adafruit_minimqtt as MQTT
 from adafruit_matrixportal.network import Network
 from adafruit_matrixportal.matrix import Matrix
-from adafruit_bitmap_font import bitmap_font
 from adafruit_lis3dh import LIS3DH_I2C
 from displayio import Group
 from rtc import RTC
 from secrets import secrets
 
 
-from app.utils import matrix_rotation, parse_timestamp, load_sprites_brightness_adjusted
+from app.font import load_font
+from app.utils import (
+    matrix_rotation,
+    parse_timestamp,
+    load_sprites,
+    SPRITES_MODE_RAM_CROP,
+)
+from app.clock import time_service
+from app.context import FrameContext
 from app.hass import HASS
+from app.palettes import BrightnessPalette, BRIGHTNESS_DEFAULT
+from app.poller import AdaptivePoller
+from app.scheduler import FrameScheduler
+from app.theme_cache import ThemeCache
 from app.themes._common import build_splash_group
 
 # Constants
@@ -27,12 +39,21 @@ BUTTON_DOWN = 1
 BUTTON_THEME_CHANGE = BUTTON_DOWN
 BUTTON_THEME_ACTION = BUTTON_UP
 
+SPRITES_TILES = 17  # tiles 0-16 of the sheet are used by the themes
+
 # Static Resources
 
-sprites_bitmap, sprites_palette = load_sprites_brightness_adjusted(
-    "/sprites.bmp", transparent_index=31
+SPRITES_MODE = secrets.get("sprites_mode", SPRITES_MODE_RAM_CROP)
+SPRITES_BRIGHTNESS = secrets.get("sprites_brightness", BRIGHTNESS_DEFAULT)
+sprites_bitmap, sprites_source_palette = load_sprites(
+    "/sprites.bmp", transparent_index=31, mode=SPRITES_MODE, tile_count=SPRITES_TILES
 )
-font_bitocra = bitmap_font.load_font("/bitocra7.bdf")
+# Every brightness level is precomputed now; switching later is a table copy
+sprites_brightness = BrightnessPalette(
+    sprites_source_palette, brightness=SPRITES_BRIGHTNESS
+)
+sprites_palette = sprites_brightness.palette
+font_bitocra = load_font("/bitocra7.bin")
 
 DEBUG = secrets.get("debug", False)
 NTP_ENABLE = secrets.get("ntp_enable", True)
@@ -40,6 +61,16 @@ NTP_INTERVAL = secrets.get("ntp_interval", 3600)
 BIT_DEPTH = secrets.get("matrix_bit_depth", 6)
 COLOR_ORDER = secrets.get("matrix_color_order", "RGB")
 MQTT_PREFIX = secrets.get("mqtt_prefix", "matrixportal")
+FPS = secrets.get("fps", 30)
+HASS_PUBLISH_INTERVAL = secrets.get("hass_publish_interval", 1.0)
+HASS_DEFER_DISCOVERY = secrets.get("hass_defer_discovery", True)
+MQTT_BACKOFF_MIN = secrets.get("mqtt_backoff_min", 1)
+MQTT_BACKOFF_MAX = secrets.get("mqtt_backoff_max", 60)
+MQTT_POLL_MIN = secrets.get("mqtt_poll_min", 0.02)
+MQTT_POLL_MAX = secrets.get("mqtt_poll_max", 0.5)
+THEME_CACHE_SIZE = secrets.get("theme_cache_size", 2)
+THEME_MIN_FREE = secrets.get("theme_min_free", 24 * 1024)
+THEME_PREWARM = secrets.get("theme_prewarm", True)
 
 
 # Manager Logic
@@ -48,7 +79,14 @@ MQTT_PREFIX = secrets.get("mqtt_prefix", "matrixportal")
 class Manager:
     def __init__(self, themes=None, debug=DEBUG):
         print(f"Manager > Init: Themes={themes}")
+        self.boot_started = time.monotonic()
         self.debug = debug
+        # Frame Scheduler
+        self.scheduler = FrameScheduler(fps=FPS)
+        self.poller = AdaptivePoller(
+            self.scheduler, min_interval=MQTT_POLL_MIN, max_interval=MQTT_POLL_MAX
+        )
+        self.ctx = FrameContext()
         # RGB Matrix
         self.matrix = Matrix(bit_depth=BIT_DEPTH, color_order=COLOR_ORDER)
         # Accelerometer
@@ -58,7 +96,9 @@ class Manager:
         self.display = self.matrix.display
         self.display.rotation = matrix_rotation(self.accelerometer)
         self.group_splash = build_splash_group(font=font_bitocra)
-        self.display.show(self.group_splash)
+        self.group_blank = Group()
+        self.group_shown = None
+        self._show(self.group_splash)
         # Networking
         self.group_splash[1].text = "wifi"
         self.network = Network(status_neopixel=board.NEOPIXEL, debug=self.debug)
@@ -76,11 +116,22 @@ class Manager:
         self._setup_mqtt_client()
         gc.collect()
         # Home Assistant
-        self.hass = HASS(self.mqtt, self.device_id, self.state)
+        self.hass = HASS(
+            self.mqtt,
+            self.device_id,
+            self.state,
+            publish_interval=HASS_PUBLISH_INTERVAL,
+            nvm=nvm,
+        )
         self._setup_hass_entities()
+        self.hass.add_subscription(f"matrixportal/{self.device_id}/#", 1)
+        self.ctx.bind(self.hass.entities)
         # Theme
         self.group_splash[1].text = "themes"
         self.themes = self._install_themes(themes)
+        self.theme_cache = ThemeCache(
+            self.themes, max_size=THEME_CACHE_SIZE, min_free=THEME_MIN_FREE
+        )
         gc.collect()
 
     def run(self):
@@ -98,30 +149,48 @@ class Manager:
         if NTP_ENABLE:
             self.group_splash[1].text = "ntp"
             asyncio.create_task(self._ntp_update())
+        asyncio.create_task(time_service.run())
         asyncio.create_task(self._check_gpio_buttons())
         asyncio.create_task(self._mqtt_poll())
+        asyncio.create_task(self._mqtt_supervise())
+        asyncio.create_task(self.mqtt.keepalive())
+        asyncio.create_task(self.hass.run())
         await asyncio.create_task(self._setup_themes())
-        self.mqtt.subscribe(f"matrixportal/{self.device_id}/#", 1)
+        if not HASS_DEFER_DISCOVERY:
+            await self._hass_discover()
         print(
             "Manager > Loop Start: Device={} | Theme={} | Mem={}".format(
                 self.device_id, self.get_theme(), gc.mem_free()
             )
         )
+        # Refresh explicitly from tick, and only when the scene has changed
+        self.display.auto_refresh = False
+        self.scheduler.start_frame()
+        await self.tick()
+        print(f"Manager > First Frame: Boot={self._boot_ms()}ms")
+        if HASS_DEFER_DISCOVERY:
+            asyncio.create_task(self._hass_discover())
+        if THEME_PREWARM:
+            asyncio.create_task(self._prewarm_next_theme())
+        skipped = await self.scheduler.end_frame()
         while True:
-            await self.tick()
-            await asyncio.sleep(0.0001)
+            self.scheduler.start_frame()
+            # Frame slots dropped after an overrun still advance the animation
+            await self.tick(1 + skipped)
+            skipped = await self.scheduler.end_frame()
 
-    async def tick(self):
+    async def tick(self, steps=1):
         theme_idx = self.state["theme"]
-        frame = self.state["frame"]
+        frame = self.state["frame"] + steps - 1
         button = self.state["button"]
-        entity_power = self.hass.entities.get("power")
-        theme = self.get_theme()
-        await theme.tick(self.state, self.hass.entities)
-        group = await theme.render_group()
-        self.display.show(
-            group if entity_power.get_state().get("state") == "ON" else Group()
-        )
+        ctx = self.ctx
+        ctx.update(frame, steps)
+        theme = await self.theme_cache.get(theme_idx)
+        await theme.tick(ctx)
+        group = await theme.render_group() if ctx.power else self.group_blank
+        if self._show(group) or (ctx.power and theme.dirty):
+            self.display.refresh(minimum_frames_per_second=0)
+            theme.dirty = False
         if button is not None:
             if button == BUTTON_THEME_ACTION:
                 await asyncio.create_task(theme.on_button())
@@ -129,25 +198,58 @@ class Manager:
                 self.set_next_theme()
             self.state["button"] = None
         self.state["frame"] = frame + 1
-        if frame % 100 == 0:
+        if ctx.every(100):
             gc.collect()
             if self.debug:
                 print(
-                    "Manager > Debug: Mem={} | Theme={} [{}] | Frame={}".format(
-                        gc.mem_free(), theme.__theme_name__, theme_idx, frame
+                    "Manager > Debug: Mem={} | Theme={} [{}] | Frame={} | Scheduler={} "
+                    "| Poller={} | Themes={}".format(
+                        gc.mem_free(),
+                        theme.__theme_name__,
+                        theme_idx,
+                        frame,
+                        self.scheduler.stats(),
+                        self.poller.stats(),
+                        self.theme_cache.stats(),
                     )
                 )
+                self.scheduler.reset_stats()
+                self.poller.reset_stats()
+
+    def _show(self, group):
+        # Only swap the root group when it actually changes
+        if group is self.group_shown:
+            return False
+        self.display.show(group)
+        self.group_shown = group
+        return True
 
     def get_theme(self):
         return self.themes[self.state["theme"]]
 
     def set_next_theme(self):
+        self.state["theme"] = self._next_theme_idx()
+        if THEME_PREWARM:
+            asyncio.create_task(self._prewarm_next_theme())
+
+    def _next_theme_idx(self):
         count = len(self.themes)
         idx = self.state["theme"]
         idx += 1
         if idx + 1 > count:
             idx = 0
-        self.state["theme"] = idx
+        return idx
+
+    # Set up the theme after the current one during idle frame time, so the
+    # next switch does not stall rendering
+    async def _prewarm_next_theme(self):
+        scheduler = self.scheduler
+        while (
+            self.theme_cache.current != self.state["theme"]
+            or scheduler.slack() < scheduler.frame_ms // 2
+        ):
+            await asyncio.sleep(0.01)
+        await self.theme_cache.prewarm(self._next_theme_idx())
 
     async def _ntp_update(self):
         self.group_splash[1].text = "ntp"
@@ -177,32 +279,100 @@ class Manager:
             username=secrets.get("mqtt_user"),
             password=secrets.get("mqtt_password"),
             port=secrets.get("mqtt_port", 1883),
+            # One socket attempt per call; _mqtt_supervise retries with backoff
+            # so a broker outage never stalls the render loop for long
+            connect_retries=1,
         )
         self.mqtt.on_connect = self._on_mqtt_connect
         self.mqtt.on_disconnect = self._on_mqtt_disconnect
         self.mqtt.on_message = self._on_mqtt_message
-        self.mqtt.connect()
+        try:
+            self.mqtt.connect()
+        except (OSError, RuntimeError, MQTT.MMQTTException) as error:
+            # Broker unreachable at boot; the supervisor keeps trying
+            print(f"MQTT > Connect Failed: {error}")
         gc.collect()
 
     async def _mqtt_poll(self, timeout=0.000001):
+        poller = self.poller
         while True:
-            self.mqtt.loop(timeout=timeout)
-            await asyncio.sleep(timeout)
+            delay = poller.interval
+            if self._mqtt_connected():
+                if poller.ready():
+                    try:
+                        rcs = self.mqtt.loop(timeout=timeout)
+                        poller.record(
+                            rcs is not None, self.mqtt.pending_publishes() > 0
+                        )
+                    except (OSError, RuntimeError, MQTT.MMQTTException) as error:
+                        # The client has dropped the connection; the supervisor
+                        # reconnects while publishes queue up offline
+                        print(f"MQTT > Poll Error: {error}")
+                    delay = poller.interval
+                else:
+                    delay = poller.retry
+            await asyncio.sleep(delay)
+
+    # Reconnect in the background, backing off exponentially between attempts
+    async def _mqtt_supervise(self):
+        delay = MQTT_BACKOFF_MIN
+        while True:
+            if self._mqtt_connected():
+                delay = MQTT_BACKOFF_MIN
+                await asyncio.sleep(1)
+                continue
+            try:
+                if not self.network.is_connected:
+                    self.network.connect(max_attempts=1)
+                # CONNACK is awaited without blocking the render loop
+                await self.mqtt.reconnect_async()
+                print(f"MQTT > Reconnected: Pending={self.mqtt.pending_publishes()}")
+                if not self.hass.discovered:
+                    asyncio.create_task(self._hass_discover())
+                continue
+            except (OSError, RuntimeError, MQTT.MMQTTException) as error:
+                print(f"MQTT > Reconnect Failed: {error} | Retry={delay}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MQTT_BACKOFF_MAX)
+
+    def _mqtt_connected(self):
+        try:
+            return self.mqtt.is_connected()
+        except MQTT.MMQTTException:
+            return False
+
+    async def _hass_discover(self):
+        started = time.monotonic()
+        try:
+            configs = self.hass.discover()
+        except (OSError, RuntimeError, MQTT.MMQTTException) as error:
+            # Retried by the supervisor once the broker is back
+            print(f"HASS > Discovery Failed: {error}")
+            return
+        sent = time.monotonic()
+        # PUBACKs are picked up by the MQTT poll task; check at its fastest rate
+        # rather than spinning, as this can wait out a whole broker outage
+        while self.mqtt.pending_publishes():
+            await asyncio.sleep(MQTT_POLL_MIN)
+        self.hass.save_discovery()
+        print(
+            "HASS > Discovery: Entities={} | Configs={} | Sent={}ms | Acked={}ms | "
+            "Boot={}ms".format(
+                len(self.hass.entities),
+                configs,
+                int((sent - started) * 1000),
+                int((time.monotonic() - started) * 1000),
+                self._boot_ms(),
+            )
+        )
+
+    def _boot_ms(self):
+        return int((time.monotonic() - self.boot_started) * 1000)
 
     def _on_mqtt_message(self, client, topic, message):
+        # Entity command topics are dispatched by topic callbacks registered in
+        # Entity.configure, so only unmatched messages arrive here
         print(f"MQTT > Message: Topic={topic} | Message={message}")
-        # MESSAGE: POWER
-        entity_power = self.hass.entities.get("power")
-        if topic == entity_power.topic_command:
-            entity_power.update(dict(state="ON" if message == "ON" else "OFF"))
-        # MESSAGE: DATE_RGB
-        entity_date_rgb = self.hass.entities.get("date_rgb")
-        if topic == entity_date_rgb.topic_command:
-            entity_date_rgb.update(json.loads(message))
-        # MESSAGE: TIME_RGB
-        entity_time_rgb = self.hass.entities.get("time_rgb")
-        if topic == entity_time_rgb.topic_command:
-            entity_time_rgb.update(json.loads(message))
 
         """
         prefix_theme_next = build_topic_prefix(
@@ -254,6 +424,30 @@ class Manager:
                 color_mode="rgb",
             ),
         )
+        self.hass.entities["brightness"] = self.hass.add_entity(
+            "brightness",
+            "light",
+            dict(
+                color_mode=True, supported_color_modes=["brightness"], brightness=True
+            ),
+            dict(
+                state="ON",
+                brightness=sprites_brightness.hass_brightness(),
+                color_mode="brightness",
+            ),
+        )
+        self.hass.entities["brightness"].add_observer(self._on_brightness)
+
+    # Swap in the precomputed sprite palette nearest the requested brightness;
+    # turning the light off drops to the dimmest level
+    def _on_brightness(self, entity):
+        value = entity.brightness if entity.is_on else 0
+        if sprites_brightness.set_hass_brightness(value):
+            print(
+                f"Manager > Brightness: Level={sprites_brightness.level} | Value={value}"
+            )
+            for theme in self.themes:
+                theme.dirty = True
 
     def _install_themes(self, theme_classes):
         themes = []
@@ -269,10 +463,11 @@ class Manager:
             themes.append(theme)
         return themes
 
+    # Themes are set up on first show; only the initial one is needed now and
+    # the next is prewarmed in idle frame time once the first frame is out
     async def _setup_themes(self):
-        for theme in self.themes:
-            await theme.setup()
-            gc.collect()
+        await self.theme_cache.get(self.state["theme"])
+        gc.collect()
 
     def _initial_state(self):
         self.state = {
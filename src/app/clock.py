@@ -0,0 +1,76 @@
+import asyncio
+from rtc import RTC
+
+EVENT_SECOND = 0
+EVENT_MINUTE = 1
+EVENT_HOUR = 2
+EVENT_DAY = 3
+
+POLL_INTERVAL = 0.01  # seconds between RTC reads while waiting for a new second
+
+
+class TimeService:
+    """Single source of wall clock time for widgets and themes.
+
+    The RTC only has one second resolution, so the service reads it once
+    just before each expected second boundary, polls briefly until the second
+    ticks over and re-anchors on that moment. Subscribers are called with the
+    current ``struct_time`` when the second, minute, hour or day changes,
+    rather than each of them reading the RTC every frame.
+    """
+
+    def __init__(self):
+        self.rtc = RTC()
+        self.reset()
+
+    def reset(self):
+        self.now = None
+        self.subscribers = ([], [], [], [])
+
+    # Subscribe to an event, calling back immediately with the current time
+    def subscribe(self, event, callback):
+        self.subscribers[event].append(callback)
+        if self.now is None:
+            self.now = self.rtc.datetime
+        callback(self.now)
+
+    def unsubscribe(self, event, callback):
+        if callback in self.subscribers[event]:
+            self.subscribers[event].remove(callback)
+
+    # Read the RTC and publish any changes, returning True on a new second
+    def update(self):
+        now = self.rtc.datetime
+        last = self.now
+        if (
+            last is not None
+            and now.tm_sec == last.tm_sec
+            and now.tm_min == last.tm_min
+            and now.tm_hour == last.tm_hour
+            and now.tm_mday == last.tm_mday
+        ):
+            return False
+        self.now = now
+        self._publish(EVENT_SECOND, now)
+        if last is None or now.tm_min != last.tm_min:
+            self._publish(EVENT_MINUTE, now)
+        if last is None or now.tm_hour != last.tm_hour:
+            self._publish(EVENT_HOUR, now)
+        if last is None or now.tm_mday != last.tm_mday:
+            self._publish(EVENT_DAY, now)
+        return True
+
+    async def run(self):
+        while True:
+            if self.update():
+                # Sleep until just before the next boundary, then poll for it
+                await asyncio.sleep(1 - POLL_INTERVAL)
+            else:
+                await asyncio.sleep(POLL_INTERVAL)
+
+    def _publish(self, event, now):
+        for callback in self.subscribers[event]:
+            callback(now)
+
+
+time_service = TimeService()
@@ -0,0 +1,56 @@
+class FrameContext:
+    """Per-frame values shared by the theme, its widgets and its sprites.
+
+    Filled once per frame by the manager so that each consumer reads plain
+    attributes instead of repeating dictionary lookups. The power and
+    visibility flags are kept current by entity observers, so they are only
+    recomputed when Home Assistant actually changes them.
+    """
+
+    __slots__ = (
+        "frame",
+        "steps",
+        "power",
+        "time_visible",
+        "date_visible",
+    )
+
+    def __init__(self, entities=None):
+        self.frame = 0
+        self.steps = 1
+        self.power = True
+        self.time_visible = True
+        self.date_visible = True
+        if entities is not None:
+            self.bind(entities)
+
+    # Track entity flags via observers; missing entities count as enabled
+    def bind(self, entities):
+        for name, handler in (
+            ("power", self._on_power),
+            ("time_rgb", self._on_time_rgb),
+            ("date_rgb", self._on_date_rgb),
+        ):
+            entity = entities.get(name)
+            if entity is not None:
+                entity.add_observer(handler)
+                handler(entity)
+
+    # steps is the number of frame slots this frame covers: 1, plus any slots
+    # the scheduler dropped after an overrun
+    def update(self, frame, steps=1):
+        self.frame = frame
+        self.steps = steps
+
+    # True if a multiple of n frames was reached during this frame's steps
+    def every(self, n):
+        return self.frame % n < self.steps
+
+    def _on_power(self, entity):
+        self.power = entity.is_on
+
+    def _on_time_rgb(self, entity):
+        self.time_visible = entity.is_on
+
+    def _on_date_rgb(self, entity):
+        self.date_visible = entity.is_on
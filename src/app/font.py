@@ -0,0 +1,87 @@
+import struct
+from displayio import Bitmap
+from fontio import Glyph
+
+# Binary glyph font built by scripts/build_font.py
+FONT_MAGIC = b"MPF1"
+HEADER_FORMAT = "<4sBBbbbbH"
+INDEX_FORMAT = "<HBBbbbxI"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+INDEX_SIZE = struct.calcsize(INDEX_FORMAT)
+
+
+class BinaryFont:
+    """Font compatible with adafruit_display_text that reads glyphs on demand.
+
+    Only the header and the small sorted glyph index are held in RAM. Glyph
+    bitmaps are read from the file the first time they are requested and
+    cached, so unused glyphs never cost any memory.
+    """
+
+    def __init__(self, filename):
+        self.file = open(filename, "rb")
+        header = self.file.read(HEADER_SIZE)
+        (
+            magic,
+            self.ascent,
+            self.descent,
+            bbox_w,
+            bbox_h,
+            bbox_dx,
+            bbox_dy,
+            self.count,
+        ) = struct.unpack(HEADER_FORMAT, header)
+        if magic != FONT_MAGIC:
+            raise ValueError("Invalid font file: {}".format(filename))
+        self.bounding_box = (bbox_w, bbox_h, bbox_dx, bbox_dy)
+        self.index = self.file.read(self.count * INDEX_SIZE)
+        self.glyphs = {}
+
+    def get_bounding_box(self):
+        return self.bounding_box
+
+    def load_glyphs(self, code_points):
+        if isinstance(code_points, int):
+            code_points = (code_points,)
+        elif isinstance(code_points, str):
+            code_points = [ord(c) for c in code_points]
+        for code_point in code_points:
+            self.get_glyph(code_point)
+
+    def get_glyph(self, code_point):
+        glyph = self.glyphs.get(code_point)
+        if glyph is not None:
+            return glyph
+        entry = self._find(code_point)
+        if entry is None:
+            return None
+        _, width, height, dx, dy, shift_x, offset = entry
+        row_bytes = (width + 7) // 8
+        self.file.seek(offset)
+        rows = self.file.read(row_bytes * height)
+        bitmap = Bitmap(width, height, 2)
+        for y in range(height):
+            for x in range(width):
+                if rows[y * row_bytes + (x >> 3)] & (0x80 >> (x & 7)):
+                    bitmap[x, y] = 1
+        glyph = Glyph(bitmap, 0, width, height, dx, dy, shift_x, 0)
+        self.glyphs[code_point] = glyph
+        return glyph
+
+    def _find(self, code_point):
+        # Binary search of the sorted index, straight from the raw bytes
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            code = struct.unpack_from("<H", self.index, mid * INDEX_SIZE)[0]
+            if code == code_point:
+                return struct.unpack_from(INDEX_FORMAT, self.index, mid * INDEX_SIZE)
+            if code < code_point:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+
+def load_font(filename):
+    return BinaryFont(filename)
@@ -1,10 +1,39 @@
+import asyncio
 import json
+import struct
+import time
+from binascii import crc32
 
 HASS_TOPIC_PREFIX = "homeassistant"
 HASS_ENTITY_ID_PREFIX = "mqttmatrix_"
+HASS_PUBLISH_INTERVAL = 1.0  # minimum seconds between state publishes per entity
+HASS_STATUS_ONLINE = "online"
+
+# Discovery config hashes kept in NVM: header, then (name crc, config crc) pairs
+DISCOVERY_CACHE_MAGIC = b"HDC1"
+DISCOVERY_CACHE_HEADER = "<4sB"
+DISCOVERY_CACHE_ENTRY = "<II"
+DISCOVERY_CACHE_SLOTS = 32
 
 
 class Entity:
+    __slots__ = (
+        "name",
+        "device_class",
+        "mqtt",
+        "options",
+        "hass_topic_prefix",
+        "topic_config",
+        "topic_command",
+        "topic_state",
+        "topic_state_bytes",
+        "state",
+        "observers",
+        "pending",
+        "published",
+        "published_at",
+    )
+
     def __init__(
         self,
         host_id,
@@ -25,9 +54,15 @@ class Entity:
         self.topic_config = f"{topic_prefix}/config"
         self.topic_command = f"{topic_prefix}/set"
         self.topic_state = f"{topic_prefix}/state"
+        # Encoded once, as state is republished on every update
+        self.topic_state_bytes = self.topic_state.encode("utf-8")
         self.state = dict()
+        self.observers = []
+        self.pending = False  # state changed since the last publish
+        self.published = None  # last payload sent to the state topic
+        self.published_at = None
 
-    def configure(self):
+    def build_config(self):
         auto_config = dict(
             name=self.name,
             unique_id=self.name,
@@ -38,40 +73,263 @@ class Entity:
         )
         config = auto_config.copy()
         config.update(self.options)
-        print(f"hass.entity.configure: name={self.name} config={config}")
-        self.mqtt.publish(self.topic_config, json.dumps(config), retain=True, qos=1)
-        self.mqtt.subscribe(self.topic_command, 1)
+        return config
+
+    def publish_config(self, payload):
+        print(f"hass.entity.configure: name={self.name} config={payload}")
+        self.mqtt.publish(
+            self.topic_config, payload, retain=True, qos=1, blocking=False
+        )
+
+    # Register the command handler, returning the topic to subscribe to
+    def configure(self):
+        # Index the command topic so incoming messages resolve in one lookup
+        self.mqtt.add_topic_callback(self.topic_command, self._on_mqtt_command)
+        return self.topic_command
 
     def get_state(self):
         return self.state
 
+    # Register callback(entity), called only when the state actually changes
+    def add_observer(self, callback):
+        self.observers.append(callback)
+
+    def remove_observer(self, callback):
+        if callback in self.observers:
+            self.observers.remove(callback)
+
+    # Translate an MQTT command payload into a state update
+    def parse_command(self, message):
+        return json.loads(message)
+
+    def on_command(self, message):
+        self.update(self.parse_command(message))
+
+    def _on_mqtt_command(self, client, topic, message):
+        self.on_command(message)
+
     def update(self, new_state=None):
         if new_state is None:
             new_state = dict()
+        changed = False
+        for key, value in new_state.items():
+            if self.state.get(key) != value:
+                changed = True
         self.state.update(new_state)
-        print(f"HASS > Entity Update: Name={self.name} State={self.state}")
-        payload = (
-            self.state.get("state")
-            if self.device_class == "switch"
-            else json.dumps(self.state)
+        if changed:
+            self._apply_state()
+            for callback in self.observers:
+                callback(self)
+            # Staged only; HASS.flush publishes the latest state
+            self.pending = True
+
+    # Publish the current state unless it matches what was last sent
+    def publish(self, now):
+        self.pending = False
+        payload = self.build_payload()
+        if payload == self.published:
+            return False
+        print(f"HASS > Entity Publish: Name={self.name} Payload={payload}")
+        # Acknowledged in the background by the MQTT poll task
+        self.mqtt.publish(
+            self.topic_state_bytes, payload, retain=True, qos=1, blocking=False
         )
-        self.mqtt.publish(self.topic_state, payload, retain=True, qos=1)
+        self.published = payload
+        self.published_at = now
+        return True
+
+    def build_payload(self):
+        return json.dumps(self.state)
+
+    # Recompute typed attributes from the state dict, once per change
+    def _apply_state(self):
+        pass
 
     def _build_entity_topic_prefix(self):
         return f"{self.hass_topic_prefix}/{self.device_class}/{self.name}"
 
 
+class Switch(Entity):
+    __slots__ = ("is_on",)
+
+    def __init__(self, *args, **kwargs):
+        self.is_on = False
+        super().__init__(*args, **kwargs)
+
+    def parse_command(self, message):
+        return dict(state="ON" if message == "ON" else "OFF")
+
+    def build_payload(self):
+        return self.state.get("state")
+
+    def _apply_state(self):
+        self.is_on = self.state.get("state") == "ON"
+
+
+class Light(Entity):
+    __slots__ = ("is_on", "color", "brightness")
+
+    def __init__(self, *args, **kwargs):
+        self.is_on = False
+        self.color = 0xFFFFFF
+        self.brightness = 255
+        super().__init__(*args, **kwargs)
+
+    def _apply_state(self):
+        self.is_on = self.state.get("state") == "ON"
+        color = self.state.get("color")
+        if color is not None:
+            self.color = (
+                (color.get("r", 0) << 16)
+                | (color.get("g", 0) << 8)
+                | color.get("b", 0)
+            )
+        self.brightness = self.state.get("brightness", self.brightness)
+
+
+class Sensor(Entity):
+    __slots__ = ("value",)
+
+    def __init__(self, *args, **kwargs):
+        self.value = None
+        super().__init__(*args, **kwargs)
+
+    def build_config(self):
+        config = dict(
+            name=self.name,
+            unique_id=self.name,
+            state_topic=self.topic_state,
+            value_template="{{ value_json.state }}",
+        )
+        config.update(self.options)
+        return config
+
+    def configure(self):
+        # Sensors are read-only, so there is no command topic to subscribe to
+        return None
+
+    def parse_command(self, message):
+        return dict()
+
+    def _apply_state(self):
+        self.value = self.state.get("state")
+
+
+class Select(Entity):
+    __slots__ = ("option",)
+
+    def __init__(self, *args, **kwargs):
+        self.option = None
+        super().__init__(*args, **kwargs)
+
+    def parse_command(self, message):
+        if message not in self.options.get("options", ()):
+            return dict()
+        return dict(state=message)
+
+    def build_payload(self):
+        return self.state.get("state")
+
+    def _apply_state(self):
+        self.option = self.state.get("state")
+
+
+ENTITY_CLASSES = dict(switch=Switch, light=Light, sensor=Sensor, select=Select)
+
+
+class DiscoveryCache:
+    """CRC32 of each entity's last published discovery config, kept in NVM.
+
+    Discovery configs are retained by the broker and rarely change, so boot
+    only needs to publish the ones whose hash differs from the stored one.
+    Writes are batched in ``save`` to limit NVM wear.
+    """
+
+    def __init__(self, nvm, offset=0, slots=DISCOVERY_CACHE_SLOTS):
+        self.nvm = nvm
+        self.offset = offset
+        self.slots = slots
+        self.hashes = dict()
+        self.dirty = False
+        self._load()
+
+    def changed(self, name, payload):
+        return self.hashes.get(crc32(name.encode())) != crc32(payload.encode())
+
+    def store(self, name, payload):
+        key = crc32(name.encode())
+        value = crc32(payload.encode())
+        if self.hashes.get(key) != value:
+            self.hashes[key] = value
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return False
+        header_size = struct.calcsize(DISCOVERY_CACHE_HEADER)
+        entry_size = struct.calcsize(DISCOVERY_CACHE_ENTRY)
+        items = list(self.hashes.items())[-self.slots :]
+        data = bytearray(header_size + len(items) * entry_size)
+        struct.pack_into(
+            DISCOVERY_CACHE_HEADER, data, 0, DISCOVERY_CACHE_MAGIC, len(items)
+        )
+        for i, (key, value) in enumerate(items):
+            struct.pack_into(
+                DISCOVERY_CACHE_ENTRY, data, header_size + i * entry_size, key, value
+            )
+        self.nvm[self.offset : self.offset + len(data)] = data
+        self.dirty = False
+        return True
+
+    def clear(self):
+        self.hashes = dict()
+        self.dirty = True
+
+    def _load(self):
+        header_size = struct.calcsize(DISCOVERY_CACHE_HEADER)
+        entry_size = struct.calcsize(DISCOVERY_CACHE_ENTRY)
+        magic, count = struct.unpack(
+            DISCOVERY_CACHE_HEADER, self.nvm[self.offset : self.offset + header_size]
+        )
+        if magic != DISCOVERY_CACHE_MAGIC or count > self.slots:
+            return
+        start = self.offset + header_size
+        data = self.nvm[start : start + count * entry_size]
+        for i in range(count):
+            key, value = struct.unpack_from(DISCOVERY_CACHE_ENTRY, data, i * entry_size)
+            self.hashes[key] = value
+
+
 class HASS:
-    def __init__(self, mqtt, device_id, state, topic_prefix=HASS_TOPIC_PREFIX):
+    def __init__(
+        self,
+        mqtt,
+        device_id,
+        state,
+        topic_prefix=HASS_TOPIC_PREFIX,
+        publish_interval=HASS_PUBLISH_INTERVAL,
+        nvm=None,
+    ):
         self.device_id = device_id
         self.mqtt = mqtt
         self.topic_prefix = topic_prefix
+        self.topic_status = f"{topic_prefix}/status"
+        self.publish_interval = publish_interval
+        # Boards without NVM publish every discovery config at boot
+        self.discovery_cache = DiscoveryCache(nvm) if nvm else None
+        # Config topic -> (entity name, payload) published but not yet acked;
+        # hashes are only cached once the broker has the config
+        self.configs_unacked = dict()
+        mqtt.on_publish = self._on_publish
+        mqtt.on_publish_expired = self._on_publish_expired
         self.entities = dict()
+        self.subscriptions = [(self.topic_status, 1)]  # sent as one SUBSCRIBE
+        self.discovered = False  # states are held back until configs are sent
         print(f"HASS > Init: Device={device_id} TopicPrefix={topic_prefix}")
-        pass
 
     def add_entity(self, name, device_class, options=None, initial_state=None):
-        entity = Entity(
+        EntityCls = ENTITY_CLASSES.get(device_class, Entity)
+        entity = EntityCls(
             self.device_id,
             name,
             device_class,
@@ -79,7 +337,103 @@ class HASS:
             self.mqtt,
             options,
         )
-        entity.configure()
+        # Staged only; configs and states are sent together by discover()
         entity.update(initial_state)
         self.entities[name] = entity
+        if self.discovered:
+            entity.publish_config(json.dumps(entity.build_config()))
+            topic = entity.configure()
+            if topic is not None:
+                self.mqtt.subscribe(topic, 1, blocking=False)
         return entity
+
+    # Queue a topic for the batched subscribe sent by discover()
+    def add_subscription(self, topic, qos=1):
+        self.subscriptions.append((topic, qos))
+
+    # Send changed discovery configs, one batched subscribe and the initial
+    # states without waiting for PUBACKs or the SUBACK; acks are collected by
+    # the MQTT loop
+    def discover(self):
+        topics = list(self.subscriptions)
+        self.mqtt.add_topic_callback(self.topic_status, self._on_hass_status)
+        published = self.publish_configs(force=False)
+        for entity in self.entities.values():
+            topic = entity.configure()
+            if topic is not None:
+                topics.append((topic, 1))
+        self.mqtt.subscribe(topics, blocking=False)
+        self.discovered = True
+        self.flush()
+        return published
+
+    def publish_configs(self, force=True):
+        cache = self.discovery_cache
+        published = 0
+        for entity in self.entities.values():
+            payload = json.dumps(entity.build_config())
+            if force or cache is None or cache.changed(entity.name, payload):
+                entity.publish_config(payload)
+                published += 1
+                if cache is not None:
+                    self.configs_unacked[entity.topic_config] = (entity.name, payload)
+        return published
+
+    def _on_publish(self, client, userdata, topic, pid):
+        entry = self.configs_unacked.pop(topic, None)
+        if entry is not None:
+            self.discovery_cache.store(*entry)
+
+    def _on_publish_expired(self, client, userdata, topic, pid):
+        entry = self.configs_unacked.pop(topic, None)
+        if entry is not None:
+            # Not cached, so the config is sent again on the next boot
+            print(f"HASS > Config Expired: Name={entry[0]}")
+            return
+        for entity in self.entities.values():
+            if entity.topic_state_bytes == topic:
+                # The broker may never have had this state; resend on next flush
+                print(f"HASS > State Expired: Name={entity.name}")
+                entity.published = None
+                entity.pending = True
+                return
+
+    # Persist config hashes, once the broker has acknowledged the configs
+    def save_discovery(self):
+        if self.discovery_cache is not None:
+            return self.discovery_cache.save()
+        return False
+
+    # Home Assistant restarted: it has lost discovery and state, so resend both
+    def _on_hass_status(self, client, topic, message):
+        if message != HASS_STATUS_ONLINE:
+            return
+        print(f"HASS > Birth: Republishing {len(self.entities)} entities")
+        self.publish_configs()
+        for entity in self.entities.values():
+            entity.published = None
+            entity.pending = True
+        self.flush()
+
+    # Publish staged entity states, at most once per interval per entity
+    def flush(self):
+        if not self.discovered:
+            return 0
+        now = time.monotonic()
+        published = 0
+        for entity in self.entities.values():
+            if not entity.pending:
+                continue
+            if (
+                entity.published_at is not None
+                and now - entity.published_at < self.publish_interval
+            ):
+                continue
+            if entity.publish(now):
+                published += 1
+        return published
+
+    async def run(self):
+        while True:
+            self.flush()
+            await asyncio.sleep(self.publish_interval / 4)
@@ -0,0 +1,167 @@
+from array import array
+
+from displayio import Palette
+
+from app.utils import copy_update_palette
+
+BRIGHTNESS_LEVELS = (0.02, 0.05, 0.1, 0.2, 0.35, 0.5, 0.75, 1.0)
+BRIGHTNESS_DEFAULT = 0.1
+BRIGHTNESS_REFERENCE = 0.1  # brightness the palette override colours are tuned for
+BRIGHTNESS_GAMMA = 1.0
+BRIGHTNESS_NORMALIZE = True  # scale so the brightest channel reaches the level
+BRIGHTNESS_SCALE_ONE = 256  # fixed point 1.0 for override scaling
+
+
+# Scale each channel of a 0xRRGGBB colour by scale / BRIGHTNESS_SCALE_ONE
+def scale_color(color, scale):
+    r = min(((color >> 16) & 0xFF) * scale // BRIGHTNESS_SCALE_ONE, 0xFF)
+    g = min(((color >> 8) & 0xFF) * scale // BRIGHTNESS_SCALE_ONE, 0xFF)
+    b = min((color & 0xFF) * scale // BRIGHTNESS_SCALE_ONE, 0xFF)
+    return (r << 16) | (g << 8) | b
+
+
+class PaletteRegistry:
+    """Shared palette variants, built once per (base palette, overrides).
+
+    Sprites that recolour a few entries of the sprite sheet palette (night
+    bricks, bin reminder pipes) ask the registry instead of cloning the
+    palette themselves, so rebuilding a scene reuses the same instances.
+    Overrides are tuples of ``(index, color)`` pairs so they can be used as
+    keys directly. Variants stay cached until evicted explicitly. When a base
+    palette is rescaled for brightness, its variants are rewritten in place
+    with the override colours scaled to match.
+    """
+
+    def __init__(self):
+        self.variants = {}
+        self.scales = {}  # brightness scale per base palette id
+        self.builds = 0
+        self.hits = 0
+
+    def get(self, palette, updates):
+        key = (id(palette), updates)
+        entry = self.variants.get(key)
+        if entry is None:
+            # Keep the base palette alive so its id cannot be reused
+            entry = (
+                palette,
+                copy_update_palette(palette, self._scaled(id(palette), updates)),
+            )
+            self.variants[key] = entry
+            self.builds += 1
+        else:
+            self.hits += 1
+        return entry[1]
+
+    # The base palette has been rewritten at a new brightness; refresh its
+    # variants in place so sprites already using them follow
+    def rescale(self, palette, scale):
+        base = id(palette)
+        self.scales[base] = scale
+        for key, (_, variant) in self.variants.items():
+            if key[0] != base:
+                continue
+            updates = self._scaled(base, key[1])
+            for i in range(len(palette)):
+                variant[i] = updates[i] if i in updates else palette[i]
+
+    def _scaled(self, base, updates):
+        scale = self.scales.get(base)
+        if scale is None:
+            return dict(updates)
+        return {i: scale_color(color, scale) for i, color in updates}
+
+    # Drop cached variants, of one base palette or all of them
+    def evict(self, palette=None):
+        if palette is None:
+            count = len(self.variants)
+            self.variants = {}
+            return count
+        base = id(palette)
+        keys = [key for key in self.variants if key[0] == base]
+        for key in keys:
+            del self.variants[key]
+        return len(keys)
+
+    def stats(self):
+        return dict(variants=len(self.variants), builds=self.builds, hits=self.hits)
+
+
+class BrightnessPalette:
+    """Sprite palette with every brightness level precomputed at boot.
+
+    Each level is a compact ``array`` of 0xRRGGBB colours, so switching level
+    is a plain copy into the live palette shared by the themes, with no float
+    maths after boot. Home Assistant brightness (0-255) is mapped to a level
+    through a 256 entry lookup table.
+    """
+
+    def __init__(
+        self,
+        source,
+        brightness=BRIGHTNESS_DEFAULT,
+        levels=BRIGHTNESS_LEVELS,
+        gamma=BRIGHTNESS_GAMMA,
+        normalize=BRIGHTNESS_NORMALIZE,
+        reference=BRIGHTNESS_REFERENCE,
+    ):
+        count = len(source)
+        colors = [source[i] for i in range(count)]
+        peak = 0xFF
+        if normalize:
+            peak = max(
+                [max((c >> 16) & 0xFF, (c >> 8) & 0xFF, c & 0xFF) for c in colors] + [1]
+            )
+        self.levels = tuple(levels)
+        self.tables = []
+        self.scales = array("H")  # override scale per level, fixed point
+        for level in self.levels:
+            table = array("L", [0] * count)
+            for i, color in enumerate(colors):
+                scaled = 0
+                for shift in (16, 8, 0):
+                    value = ((color >> shift) & 0xFF) / peak
+                    channel = int(round((value**gamma) * level * 0xFF))
+                    scaled |= min(channel, 0xFF) << shift
+                table[i] = scaled
+            self.tables.append(table)
+            self.scales.append(int(level / reference * BRIGHTNESS_SCALE_ONE))
+        # Nearest level for each Home Assistant brightness value
+        self.lookup = bytearray(256)
+        for value in range(256):
+            self.lookup[value] = min(
+                range(len(self.levels)),
+                key=lambda idx: abs(self.levels[idx] * 0xFF - value),
+            )
+        self.palette = Palette(count)
+        for i in range(count):
+            if source.is_transparent(i):
+                self.palette.make_transparent(i)
+        self.level = None
+        self.set_level(self.nearest(brightness))
+
+    # Index of the precomputed level closest to a 0.0-1.0 brightness
+    def nearest(self, brightness):
+        return self.lookup[min(max(int(brightness * 0xFF + 0.5), 0), 0xFF)]
+
+    def set_level(self, idx):
+        if idx == self.level:
+            return False
+        table = self.tables[idx]
+        palette = self.palette
+        for i in range(len(table)):
+            palette[i] = table[i]
+        palette_registry.rescale(palette, self.scales[idx])
+        self.level = idx
+        return True
+
+    # Switch to the level nearest a Home Assistant brightness (0-255)
+    def set_hass_brightness(self, value):
+        return self.set_level(self.lookup[min(max(int(value), 0), 0xFF)])
+
+    # Home Assistant brightness (0-255) of the current level
+    def hass_brightness(self):
+        return int(self.levels[self.level] * 0xFF + 0.5)
+
+
+palette_registry = PaletteRegistry()
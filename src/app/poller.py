@@ -0,0 +1,83 @@
+from adafruit_ticks import ticks_ms, ticks_diff
+
+DEFAULT_MIN_INTERVAL = 0.02  # seconds between polls right after traffic
+DEFAULT_MAX_INTERVAL = 0.5  # seconds between polls once idle
+DEFAULT_BACKOFF = 2
+DEFAULT_MIN_SLACK = 4  # frame budget (ms) a poll needs to run
+
+
+class AdaptivePoller:
+    """Decides when the MQTT socket is next worth polling.
+
+    Every empty poll costs an SPI exchange with the ESP32, so the interval
+    doubles after each poll that finds nothing, up to ``max_interval``, and
+    snaps back to ``min_interval`` as soon as a packet arrives or a PUBACK is
+    outstanding. Polls are also held back when the frame scheduler has less
+    than ``min_slack`` milliseconds of the current frame left, so they land
+    in the idle part of the frame rather than delaying the next one. A
+    deferred poll is retried as soon as the current frame's budget is over.
+    Frames that overrun have no idle part, so after an overrun, or once
+    ``max_interval`` has passed without a poll, the poll runs regardless.
+    """
+
+    def __init__(
+        self,
+        scheduler,
+        min_interval=DEFAULT_MIN_INTERVAL,
+        max_interval=DEFAULT_MAX_INTERVAL,
+        backoff=DEFAULT_BACKOFF,
+        min_slack=DEFAULT_MIN_SLACK,
+    ):
+        self.scheduler = scheduler
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.min_slack = min_slack
+        self.interval = min_interval
+        self.retry = min_interval  # delay before retrying a deferred poll
+        self.last_poll = ticks_ms()
+        self.reset_stats()
+
+    def ready(self):
+        scheduler = self.scheduler
+        if scheduler.overran:
+            return True
+        if ticks_diff(ticks_ms(), self.last_poll) >= self.max_interval * 1000:
+            self.forced += 1
+            return True
+        slack = scheduler.slack()
+        if slack < self.min_slack:
+            self.deferred += 1
+            # Wake once the frame budget is spent, in the next idle slot
+            self.retry = max(slack, 1) / 1000
+            return False
+        return True
+
+    # Record a poll result and pick the interval until the next one
+    def record(self, hit, expecting=False):
+        self.polls += 1
+        self.last_poll = ticks_ms()
+        if hit:
+            self.hits += 1
+        if hit or expecting:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        return self.interval
+
+    def stats(self):
+        polls = self.polls or 1
+        return dict(
+            polls=self.polls,
+            hits=self.hits,
+            hit_rate=round(self.hits / polls, 2),
+            deferred=self.deferred,
+            forced=self.forced,
+            interval_ms=int(self.interval * 1000),
+        )
+
+    def reset_stats(self):
+        self.polls = 0
+        self.hits = 0
+        self.deferred = 0
+        self.forced = 0
@@ -0,0 +1,81 @@
+import asyncio
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
+
+DEFAULT_FPS = 30
+DEFAULT_MAX_SKIP = 5
+
+
+class FrameScheduler:
+    """Paces the render loop to a target frame rate.
+
+    Each frame gets a fixed time budget (1000 / fps milliseconds). Time left
+    over once a frame has rendered is handed back to the other asyncio tasks
+    (MQTT polling, buttons, NTP). When a frame overruns its budget, the missed
+    frame slots are dropped instead of being rendered back-to-back to catch up.
+    """
+
+    def __init__(self, fps=DEFAULT_FPS, max_skip=DEFAULT_MAX_SKIP):
+        self.fps = max(1, int(fps))
+        self.frame_ms = max(1, 1000 // self.fps)
+        self.max_skip = max_skip
+        self.deadline = None
+        self.frame_start = None
+        self.overran = False  # the last frame overran; set until the next starts
+        self.frames = 0
+        self.frames_skipped = 0
+        self.overruns = 0
+        self.busy_ms = 0
+        self.idle_ms = 0
+
+    def start_frame(self):
+        now = ticks_ms()
+        if self.deadline is None:
+            self.deadline = now
+        self.frame_start = now
+        self.overran = False
+        self.deadline = ticks_add(self.deadline, self.frame_ms)
+        return now
+
+    def slack(self):
+        # Milliseconds remaining in the current frame budget (negative if overrun)
+        if self.deadline is None:
+            return self.frame_ms
+        return ticks_diff(self.deadline, ticks_ms())
+
+    async def end_frame(self):
+        # Returns the number of frame slots dropped because this frame overran
+        now = ticks_ms()
+        self.frames += 1
+        self.busy_ms += ticks_diff(now, self.frame_start)
+        remaining = ticks_diff(self.deadline, now)
+        if remaining > 0:
+            self.idle_ms += remaining
+            await asyncio.sleep(remaining / 1000)
+            return 0
+        # Overrun: drop the missed slots and re-anchor on the current time so the
+        # next frame gets a full budget rather than a burst of catch-up frames
+        self.overruns += 1
+        self.overran = True
+        skipped = min(-remaining // self.frame_ms, self.max_skip)
+        self.frames_skipped += skipped
+        self.deadline = now
+        await asyncio.sleep(0)
+        return skipped
+
+    def stats(self):
+        frames = self.frames or 1
+        return dict(
+            fps=self.fps,
+            frames=self.frames,
+            skipped=self.frames_skipped,
+            overruns=self.overruns,
+            busy_ms=self.busy_ms // frames,
+            idle_ms=self.idle_ms // frames,
+        )
+
+    def reset_stats(self):
+        self.frames = 0
+        self.frames_skipped = 0
+        self.overruns = 0
+        self.busy_ms = 0
+        self.idle_ms = 0
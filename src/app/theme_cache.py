@@ -0,0 +1,92 @@
+import gc
+
+DEFAULT_MAX_SIZE = 2
+DEFAULT_MIN_FREE = 24 * 1024  # bytes of heap to keep free after a theme setup
+
+
+class ThemeCache:
+    """Keeps only recently shown themes set up.
+
+    Themes are constructed cheaply at boot and only run ``setup()`` the first
+    time they are shown. Set-up themes are kept in least recently used order
+    and the oldest are torn down when there are more than ``max_size`` of
+    them, or when ``gc.mem_free()`` drops below ``min_free``. The theme being
+    shown is never evicted.
+    """
+
+    def __init__(self, themes, max_size=DEFAULT_MAX_SIZE, min_free=DEFAULT_MIN_FREE):
+        self.themes = themes
+        self.max_size = max(1, max_size)
+        self.min_free = min_free
+        self.lru = []  # indexes of set up themes, least recently used first
+        self.current = None
+        self.setups = 0
+        self.teardowns = 0
+        self.prewarms = 0
+
+    def __contains__(self, idx):
+        return idx in self.lru
+
+    # Return the theme at idx, setting it up (and evicting others) if needed
+    async def get(self, idx):
+        if idx == self.current:
+            return self.themes[idx]
+        if idx in self.lru:
+            self.lru.remove(idx)
+        else:
+            await self._evict(keep=idx, room=1)
+            await self.themes[idx].setup()
+            self.setups += 1
+        self.lru.append(idx)
+        self.current = idx
+        await self._evict(keep=idx)
+        return self.themes[idx]
+
+    # Set up a theme ahead of time, making room by dropping themes other than
+    # the one shown, but only if it fits in the memory budget
+    async def prewarm(self, idx):
+        if idx in self.lru:
+            return False
+        await self._evict(keep=self.current, room=1)
+        if len(self.lru) >= self.max_size:
+            return False
+        gc.collect()
+        if gc.mem_free() < self.min_free:
+            return False
+        await self.themes[idx].setup()
+        self.lru.insert(0, idx)
+        self.prewarms += 1
+        gc.collect()
+        if gc.mem_free() < self.min_free:
+            # Did not fit after all
+            await self._teardown(idx)
+            return False
+        return True
+
+    def stats(self):
+        return dict(
+            ready=[self.themes[idx].__theme_name__ for idx in self.lru],
+            setups=self.setups,
+            teardowns=self.teardowns,
+            prewarms=self.prewarms,
+            mem_free=gc.mem_free(),
+        )
+
+    # Tear down least recently used themes (other than keep) until there is
+    # room for `room` more and the heap is back within budget
+    async def _evict(self, keep, room=0):
+        while True:
+            victims = [idx for idx in self.lru if idx != keep]
+            if not victims:
+                return
+            if len(self.lru) + room <= self.max_size:
+                gc.collect()
+                if gc.mem_free() >= self.min_free:
+                    return
+            await self._teardown(victims[0])
+
+    async def _teardown(self, idx):
+        self.lru.remove(idx)
+        await self.themes[idx].teardown()
+        self.teardowns += 1
+        gc.collect()
@@ -1,3 +1,4 @@
+import gc
 import random
 from displayio import Group, TileGrid
 
@@ -13,29 +14,43 @@ class BaseTheme:
         self.debug = debug
         self.actors = {}
         self.group = Group()
+        self.dirty = True  # set when the scene has changed and needs a refresh
 
     # Setup the theme groups, tilesets, sprites etc
     async def setup(self):
         print("Theme > Setup: Name={}".format(self.__theme_name__))
 
-    # Teardown any resources (if neccesary) when switching themes
+    # Teardown any resources (if neccesary) when switching themes. Subclasses
+    # release their widgets and sprites, then call this to drop the scene
     async def teardown(self):
         print("Theme > Teardown: Name={}".format(self.__theme_name__))
+        self.group = Group()
+        self.dirty = True
+        gc.collect()
 
     # Render top-level theme displayio group
     async def render_group(self):
         return self.group
 
-    # Run every frame so theme can animate itself and perform other actions
-    async def tick(self, state, entities):
+    # Run every frame so theme can animate itself and perform other actions,
+    # setting self.dirty when anything visible has changed
+    async def tick(self, ctx):
         pass
-        # print("Theme > Tick: Frame={}".format(state["frame"]))
+        # print("Theme > Tick: Frame={}".format(ctx.frame))
 
     # Handle hardware button presses from manager
     async def on_button(self):
         print("Theme > Button Pressed")
 
 
+# Move by delta, stopping at dest rather than overshooting it
+def step_towards(pos, delta, dest):
+    pos += delta
+    if dest is not None and (pos - dest) * delta > 0:
+        return dest
+    return pos
+
+
 class BaseSprite(TileGrid):
     _name = "sprite"
 
@@ -95,8 +110,20 @@ class BaseSprite(TileGrid):
             self.y_velocity = 0
             self.y_dest = None
 
-    def tick(self, frame, entities):
+    def set_tile(self, tile):
+        # Returns True if the tile index changed
+        if self[0] == tile:
+            return False
+        self[0] = tile
+        return True
+
+    # Returns True if the sprite moved
+    def tick(self, ctx):
         self.update_move_velocities()
         self.reseed()
-        self.x += self.x_velocity
-        self.y += self.y_velocity
+        steps = ctx.steps
+        if self.x_velocity != 0:
+            self.x = step_towards(self.x, self.x_velocity * steps, self.x_dest)
+        if self.y_velocity != 0:
+            self.y = step_towards(self.y, self.y_velocity * steps, self.y_dest)
+        return self.x_velocity != 0 or self.y_velocity != 0
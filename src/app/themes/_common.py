@@ -1,7 +1,7 @@
-import time
 from adafruit_display_text.label import Label
-from displayio import Group
-from rtc import RTC
+from displayio import Bitmap, Group, Palette, TileGrid
+
+from app.clock import EVENT_DAY, EVENT_SECOND, time_service
 
 
 def build_splash_group(font):
@@ -11,24 +11,102 @@ def build_splash_group(font):
     return group
 
 
-class ClockLabel(Label):
+def set_hidden(widget, hidden):
+    # Returns True if visibility changed, avoiding redundant property writes
+    if widget.hidden == hidden:
+        return False
+    widget.hidden = hidden
+    return True
+
+
+CLOCK_CHARS = "0123456789: "
+CLOCK_COLON = CLOCK_CHARS.index(":")
+
+
+def build_glyph_strip(font, chars):
+    # Render each character into its own fixed-size tile of a single bitmap
+    tile_width = font.get_glyph(ord(chars[0])).shift_x
+    tile_height = font.ascent + font.descent
+    bitmap = Bitmap(tile_width * len(chars), tile_height, 2)
+    for idx, char in enumerate(chars):
+        glyph = font.get_glyph(ord(char))
+        if glyph is None:
+            continue
+        top = font.ascent - glyph.dy - glyph.height
+        for gy in range(glyph.height):
+            for gx in range(glyph.width):
+                px = glyph.dx + gx
+                py = top + gy
+                if not glyph.bitmap[gx, gy]:
+                    continue
+                if 0 <= px < tile_width and 0 <= py < tile_height:
+                    bitmap[idx * tile_width + px, py] = 1
+    return bitmap, tile_width, tile_height
+
+
+class DigitClock(TileGrid):
+    """Fixed-width HH:MM:SS clock drawn from a pre-rendered digit strip.
+
+    Unlike a Label, updating the time does no string formatting or text
+    layout: only the tiles of digits that actually changed are rewritten.
+    """
+
     def __init__(self, x, y, font, color=0x111111):
-        super().__init__(text="00:00:00", font=font, color=color)
-        self.x = x
-        self.y = y
-        self.new_second = None
+        bitmap, tile_width, tile_height = build_glyph_strip(font, CLOCK_CHARS)
+        palette = Palette(2)
+        palette.make_transparent(0)
+        palette[1] = color
+        # Match Label positioning, where y is the vertical centre of the text
+        super().__init__(
+            bitmap,
+            pixel_shader=palette,
+            width=8,
+            height=1,
+            tile_width=tile_width,
+            tile_height=tile_height,
+            default_tile=0,
+            x=x,
+            y=y - font.ascent // 2,
+        )
+        self.palette = palette
+        self.tiles = bytearray(8)
+        self[2] = self.tiles[2] = CLOCK_COLON
+        self[5] = self.tiles[5] = CLOCK_COLON
+        self.changed = False
+        time_service.subscribe(EVENT_SECOND, self.on_second)
+
+    def deinit(self):
+        time_service.unsubscribe(EVENT_SECOND, self.on_second)
+
+    def on_second(self, now):
+        if self.set_time(now.tm_hour, now.tm_min, now.tm_sec):
+            self.changed = True
+
+    def set_tile(self, idx, tile):
+        if self.tiles[idx] == tile:
+            return False
+        self.tiles[idx] = tile
+        self[idx] = tile
+        return True
 
-    def tick(self, state, entities):
-        frame = state["frame"]
-        self.hidden = entities.get("time_rgb").get_state().get("state") == "OFF"
-        now = RTC().datetime
-        ts = time.monotonic()
-        if self.new_second is None or ts > self.new_second + 1:
-            self.new_second = ts
-            hhmmss = "{:0>2d}:{:0>2d}:{:0>2d}".format(
-                now.tm_hour, now.tm_min, now.tm_sec
-            )
-            self.text = hhmmss
+    # Returns True if any digit changed
+    def set_time(self, hour, minute, second):
+        changed = False
+        for idx, value in ((0, hour), (3, minute), (6, second)):
+            tens, units = divmod(value, 10)
+            if self.set_tile(idx, tens):
+                changed = True
+            if self.set_tile(idx + 1, units):
+                changed = True
+        return changed
+
+    # Returns True if the clock changed
+    def tick(self, ctx):
+        changed = set_hidden(self, not ctx.time_visible)
+        if self.changed:
+            self.changed = False
+            changed = True
+        return changed
 
 
 class CalendarLabel(Label):
@@ -36,22 +114,20 @@ class CalendarLabel(Label):
         super().__init__(text="00/00", font=font, color=color)
         self.x = x
         self.y = y
-        self.new_hour = None
-        self.new_minute = None
-        self.new_second = None
-
-    def tick(self, state, entities):
-        frame = state["frame"]
-        self.hidden = entities.get("date_rgb").get_state().get("state") == "OFF"
-        now = RTC().datetime
-        ts = time.monotonic()
-        if self.new_second is None or ts > self.new_second + 1:
-            self.new_second = ts
-            if self.new_minute is None or now.tm_sec == 0:
-                self.new_minute = ts
-                # print("new minute")
-                if self.new_hour is None or now.tm_min == 0:
-                    self.new_hour = ts
-                    ddmm = "{:0>2d}/{:0>2d}".format(now.tm_mday, now.tm_mon)
-                    self.text = ddmm
-                    # print("new hour")
+        self.changed = False
+        time_service.subscribe(EVENT_DAY, self.on_day)
+
+    def deinit(self):
+        time_service.unsubscribe(EVENT_DAY, self.on_day)
+
+    def on_day(self, now):
+        self.text = "{:0>2d}/{:0>2d}".format(now.tm_mday, now.tm_mon)
+        self.changed = True
+
+    # Returns True if the label changed
+    def tick(self, ctx):
+        changed = set_hidden(self, not ctx.date_visible)
+        if self.changed:
+            self.changed = False
+            changed = True
+        return changed
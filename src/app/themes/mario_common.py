@@ -1,7 +1,7 @@
 import random
 
 from app.themes._base import BaseSprite
-from app.utils import copy_update_palette
+from app.palettes import palette_registry
 
 GRAVITY = 0.75
 
@@ -15,6 +15,7 @@ SPRITE_MARIO_L_WALK_START = 7  # 7,8,9
 SPRITE_BRICK = 10
 SPRITE_ROCK = 11
 SPRITE_PIPE = 12
+SPRITE_BLANK = 13  # fully transparent tile
 SPRITE_GOOMBA_STILL = 15
 SPRITE_GOOMBA_WALK = 16
 
@@ -44,18 +45,17 @@ class MarioSprite(BaseSprite):
             self.is_jumping = True
             self.y_float -= 10
 
-    def tick(self, state, entities):
-        frame = state["frame"]
-        if frame % 800 == 0:
+    def tick(self, ctx):
+        if ctx.every(800):
             self.jump()
         if self.seed >= 0 and self.seed <= 3:
             self.move_to(x=random.randint(self.x_range[0], self.x_range[1]))
         if self.is_jumping:
-            self.y_float += GRAVITY
+            self.y_float += GRAVITY * ctx.steps
         if self.y_float > self.y_orig:
             self.y_float = self.y_orig
             self.is_jumping = False
-        if frame % 4 == 0:
+        if ctx.every(4):
             self.idx_sprite += 1
             if self.idx_sprite > 2:
                 self.idx_sprite = 0
@@ -66,15 +66,18 @@ class MarioSprite(BaseSprite):
             SPRITE_MARIO_R_WALK_START if facing_right else SPRITE_MARIO_L_WALK_START
         )
 
-        self[0] = (
+        changed = self.set_tile(
             walk_start_idx + self.idx_sprite
             if self.x_velocity != 0
             else (SPRITE_MARIO_R_JUMP if facing_right else SPRITE_MARIO_L_JUMP)
             if self.is_jumping
             else (SPRITE_MARIO_R_STILL if facing_right else SPRITE_MARIO_L_STILL)
         )
-        self.y = int(self.y_float)
-        super().tick(frame, entities)
+        y = int(self.y_float)
+        if self.y != y:
+            self.y = y
+            changed = True
+        return super().tick(ctx) or changed
 
 
 class GoombaSprite(BaseSprite):
@@ -91,76 +94,107 @@ class GoombaSprite(BaseSprite):
         self.x_range = [-32, 96]
         self.idx_sprite = 0
 
-    def tick(self, state, entities):
-        frame = state["frame"]
+    def tick(self, ctx):
         if self.seed >= 0 and self.seed <= 5:
             self.move_to(x=random.randint(self.x_range[0], self.x_range[1]))
-        if frame % 8 == 0:
+        if ctx.every(8):
             self.idx_sprite += 1
             if self.idx_sprite > 1:
                 self.idx_sprite = 0
-        self[0] = (
+        changed = self.set_tile(
             SPRITE_GOOMBA_WALK + self.idx_sprite
             if self.x_velocity != 0
             else SPRITE_GOOMBA_STILL
         )
-        super().tick(frame, entities)
+        return super().tick(ctx) or changed
 
 
-class BrickSprite(BaseSprite):
-    _name = "brick"
+class FloorSprite(BaseSprite):
+    """Row of floor tiles that can be recoloured and resized in place.
+
+    The grid is allocated at its full width once; tiles outside the visible
+    span are set to a transparent tile, so scenes can be regenerated without
+    building new TileGrids.
+    """
+
+    _name = "floor"
+    TILE = None
+    PALETTE_UNDERGROUND = ()
 
     def __init__(self, bitmap, palette, x, y, width=1, height=1, underground=False):
-        if underground:
-            palette = copy_update_palette(
-                palette,
-                {7: 0x000033, 10: 0x0060, 11: 0x006066, 12: 0x000055, 13: 0x000044},
-            )
         super().__init__(
             bitmap=bitmap,
-            palette=palette,
+            palette=self._palette(palette, underground),
             x=x,
             y=y,
             width=width,
             height=height,
-            default_tile=SPRITE_BRICK,
+            default_tile=self.TILE,
         )
+        self.palette_base = palette
+        self.tiles_wide = width
 
+    @classmethod
+    def _palette(cls, palette, underground):
+        if underground:
+            return palette_registry.get(palette, cls.PALETTE_UNDERGROUND)
+        return palette
 
-class RockSprite(BaseSprite):
-    _name = "rock"
+    def set_underground(self, underground):
+        self.pixel_shader = self._palette(self.palette_base, underground)
 
-    def __init__(self, bitmap, palette, x, y, width=1, height=1, underground=False):
-        if underground:
-            palette = copy_update_palette(
-                palette,
-                {7: 0x000033, 10: 0x006077, 11: 0x006066, 12: 0x000055, 13: 0x000044},
-            )
-        super().__init__(
-            bitmap=bitmap,
-            palette=palette,
-            x=x,
-            y=y,
-            width=width,
-            height=height,
-            default_tile=SPRITE_ROCK,
-        )
+    # Show floor tiles in columns start..end-1 and blank the rest
+    def set_span(self, start, end):
+        for i in range(self.tiles_wide):
+            self[i] = self.TILE if start <= i < end else SPRITE_BLANK
+
+
+class BrickSprite(FloorSprite):
+    _name = "brick"
+    TILE = SPRITE_BRICK
+    PALETTE_UNDERGROUND = (
+        (7, 0x000033),
+        (10, 0x0060),
+        (11, 0x006066),
+        (12, 0x000055),
+        (13, 0x000044),
+    )
+
+
+class RockSprite(FloorSprite):
+    _name = "rock"
+    TILE = SPRITE_ROCK
+    PALETTE_UNDERGROUND = (
+        (7, 0x000033),
+        (10, 0x006077),
+        (11, 0x006066),
+        (12, 0x000055),
+        (13, 0x000044),
+    )
 
 
 class PipeSprite(BaseSprite):
     _name = "pipe"
-    PALETTE_BLUE = {14: 0x000066, 15: 0x000011}
-    PALETTE_GREY = {14: 0x111111, 15: 0x080808}
+    PALETTE_BLUE = ((14, 0x000066), (15, 0x000011))
+    PALETTE_GREY = ((14, 0x111111), (15, 0x080808))
 
     def __init__(self, bitmap, palette, x, y, height=1, color=None):
-        if color is not None:
-            palette = copy_update_palette(palette, color)
         super().__init__(
             bitmap=bitmap,
-            palette=palette,
+            palette=self._palette(palette, color),
             x=x,
             y=y,
             width=1,
             height=height,
             default_tile=SPRITE_PIPE,
         )
+        self.palette_base = palette
+
+    @staticmethod
+    def _palette(palette, color):
+        if color is None:
+            return palette
+        return palette_registry.get(palette, color)
+
+    def set_color(self, color):
+        self.pixel_shader = self._palette(self.palette_base, color)
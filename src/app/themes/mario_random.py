@@ -3,10 +3,11 @@ from math import floor
 import random
 
 from displayio import Group
-from rtc import RTC
 
+from app.clock import EVENT_HOUR, time_service
+from app.palettes import palette_registry
 from app.themes._base import BaseTheme
-from app.themes._common import CalendarLabel, ClockLabel
+from app.themes._common import CalendarLabel, DigitClock
 from app.themes.mario_common import (
     BrickSprite,
     GoombaSprite,
@@ -44,8 +45,10 @@ class MarioRandomTheme(BaseTheme):
     async def setup(self):
         # Call base setup
         await super().setup()
-        # Background
-        self.group.append(Group())  # empty placeholder group for now
+        # Background, built once and rearranged in place by update_background
+        self.group.append(self._build_background_group())
+        self.background_stale = True
+        time_service.subscribe(EVENT_HOUR, self.on_hour)
         # Actors
         group_actors = Group()
         self.sprite_goomba = GoombaSprite(
@@ -59,7 +62,7 @@ class MarioRandomTheme(BaseTheme):
         self.group.append(group_actors)
         # Labels
         group_labels = Group()
-        self.label_clock = ClockLabel(33, 2, font=self.font)
+        self.label_clock = DigitClock(33, 2, font=self.font)
         group_labels.append(self.label_clock)
         self.label_calendar = CalendarLabel(0, 2, font=self.font)
         group_labels.append(self.label_calendar)
@@ -68,50 +71,71 @@ class MarioRandomTheme(BaseTheme):
         await self.update_background()
         gc.collect()
 
-    async def tick(self, state, entities):
-        frame = state["frame"]
-        if frame % 1000 == 0:
+    async def teardown(self):
+        time_service.unsubscribe(EVENT_HOUR, self.on_hour)
+        self.label_clock.deinit()
+        self.label_calendar.deinit()
+        self.label_clock = self.label_calendar = None
+        self.sprite_mario = self.sprite_goomba = None
+        self.sprite_brick = self.sprite_rock = self.sprite_pipe = None
+        palette_registry.evict(self.palette)
+        await super().teardown()
+
+    # Night palettes and bin reminders depend on the hour, so redraw when it changes
+    def on_hour(self, now):
+        self.background_stale = True
+
+    async def tick(self, ctx):
+        if self.background_stale or ctx.every(1000):
             if (self.sprite_mario.x <= -16 or self.sprite_mario.x >= 64) and (
                 self.sprite_goomba.x <= -16 or self.sprite_goomba.x >= 64
             ):
                 await self.update_background()
-        self.label_clock.tick(state, entities)
-        self.label_calendar.tick(state, entities)
-        self.sprite_mario.tick(state, entities)
-        self.sprite_goomba.tick(state, entities)
-        await super().tick(state, entities)
+        if self.label_clock.tick(ctx):
+            self.dirty = True
+        if self.label_calendar.tick(ctx):
+            self.dirty = True
+        if self.sprite_mario.tick(ctx):
+            self.dirty = True
+        if self.sprite_goomba.tick(ctx):
+            self.dirty = True
+        await super().tick(ctx)
 
     async def on_button(self):
         await self.update_background()
         await super().on_button()
 
     async def update_background(self):
-        self.group[0] = self._build_random_background_group()
-        gc.collect()
+        # Only reconfigures the pooled sprites, so this neither allocates nor
+        # needs a gc.collect() mid-animation
+        self._randomize_background()
+        self.background_stale = False
+        self.dirty = True
 
-    def _build_random_background_group(self):
-        now = RTC().datetime
-        # struct_time(tm_year=2022, tm_mon=11, tm_mday=7, tm_hour=20, tm_min=40, tm_sec=50, tm_wday=0, tm_yday=311, tm_isdst=-1)
-        len_brick = random.randint(1, 3)
+    def _build_background_group(self):
         group = Group()
-        floor_brick = BrickSprite(
-            bitmap=self.bitmap,
-            palette=self.palette,
-            x=0,
-            y=24,
-            width=len_brick,
-            underground=now.tm_hour >= 16 or now.tm_hour <= 8,
+        self.sprite_brick = BrickSprite(
+            bitmap=self.bitmap, palette=self.palette, x=0, y=24, width=4
+        )
+        group.append(self.sprite_brick)
+        self.sprite_rock = RockSprite(
+            bitmap=self.bitmap, palette=self.palette, x=0, y=24, width=4
         )
-        group.append(floor_brick)
-        floor_rock = RockSprite(
-            bitmap=self.bitmap,
-            palette=self.palette,
-            x=len_brick * 16,
-            y=24,
-            width=4 - len_brick,
-            underground=now.tm_hour >= 20 or now.tm_hour <= 6,
+        group.append(self.sprite_rock)
+        self.sprite_pipe = PipeSprite(
+            bitmap=self.bitmap, palette=self.palette, x=0, y=8
         )
-        group.append(floor_rock)
+        group.append(self.sprite_pipe)
+        return group
+
+    def _randomize_background(self):
+        now = time_service.now
+        # struct_time(tm_year=2022, tm_mon=11, tm_mday=7, tm_hour=20, tm_min=40, tm_sec=50, tm_wday=0, tm_yday=311, tm_isdst=-1)
+        len_brick = random.randint(1, 3)
+        self.sprite_brick.set_span(0, len_brick)
+        self.sprite_brick.set_underground(now.tm_hour >= 16 or now.tm_hour <= 8)
+        self.sprite_rock.set_span(len_brick, 4)
+        self.sprite_rock.set_underground(now.tm_hour >= 20 or now.tm_hour <= 6)
         week_num = floor(now.tm_yday / 7)
         alt_week = week_num % 2 == 0
         # Set pipe colour to blue (blue bin) or grey (black bin) collection reminder
@@ -121,12 +145,5 @@ class MarioRandomTheme(BaseTheme):
             pipe_color = (
                 PipeSprite.PALETTE_BLUE if alt_week else PipeSprite.PALETTE_GREY
             )
-        pipe = PipeSprite(
-            bitmap=self.bitmap,
-            palette=self.palette,
-            x=random.randint(0, 48),
-            y=8,
-            color=pipe_color,
-        )
-        group.append(pipe)
-        return group
+        self.sprite_pipe.set_color(pipe_color)
+        self.sprite_pipe.x = random.randint(0, 48)
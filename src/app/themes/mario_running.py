@@ -1,10 +1,9 @@
 import gc
 
 from displayio import Group
-from rtc import RTC
 
 from app.themes._base import BaseSprite, BaseTheme
-from app.themes._common import CalendarLabel, ClockLabel
+from app.themes._common import CalendarLabel, DigitClock
 from app.themes.mario_common import BrickSprite
 
 
@@ -37,7 +36,6 @@ class MarioRunningTheme(BaseTheme):
         # Call base setup
         await super().setup()
         # Background
-        now = RTC().datetime
         group_background = Group()
         self.sprite_floor = BrickSprite(
             bitmap=self.bitmap,
@@ -67,26 +65,34 @@ class MarioRunningTheme(BaseTheme):
         self.group.append(group_actors)
         # Labels
         group_labels = Group()
-        self.label_clock = ClockLabel(33, 2, font=self.font)
+        self.label_clock = DigitClock(33, 2, font=self.font)
         group_labels.append(self.label_clock)
         self.label_calendar = CalendarLabel(0, 2, font=self.font)
         group_labels.append(self.label_calendar)
         self.group.append(group_labels)
         gc.collect()
 
-    async def tick(self, state, entities):
-        self.label_clock.tick(state, entities)
-        self.label_calendar.tick(state, entities)
-        self.sprite_mario.tick(state, entities)
-        if self.sprite_floor.x <= -64:
-            self.sprite_floor.x = 64
-        else:
-            self.sprite_floor.x -= 1
-        if self.sprite_floor_alt.x <= -64:
-            self.sprite_floor_alt.x = 64
-        else:
-            self.sprite_floor_alt.x -= 1
-        await super().tick(state, entities)
+    async def teardown(self):
+        self.label_clock.deinit()
+        self.label_calendar.deinit()
+        self.label_clock = self.label_calendar = None
+        self.sprite_mario = self.sprite_floor = self.sprite_floor_alt = None
+        await super().teardown()
+
+    async def tick(self, ctx):
+        if self.label_clock.tick(ctx):
+            self.dirty = True
+        if self.label_calendar.tick(ctx):
+            self.dirty = True
+        if self.sprite_mario.tick(ctx):
+            self.dirty = True
+        # Scrolling floor changes every frame, moving 1px per frame slot from
+        # x=64 to x=-64 and wrapping back to 64
+        self.dirty = True
+        steps = ctx.steps
+        self.sprite_floor.x = (self.sprite_floor.x - steps + 64) % 129 - 64
+        self.sprite_floor_alt.x = (self.sprite_floor_alt.x - steps + 64) % 129 - 64
+        await super().tick(ctx)
 
     async def on_button(self):
         await super().on_button()
@@ -113,16 +119,15 @@ class MarioRunningSprite(BaseSprite):
             self.is_jumping = True
             self.y_float -= 10
 
-    def tick(self, state, entities):
-        frame = state["frame"]
-        if frame % 800 == 0:
+    def tick(self, ctx):
+        if ctx.every(800):
             self.jump()
         if self.is_jumping:
-            self.y_float += GRAVITY
+            self.y_float += GRAVITY * ctx.steps
         if self.y_float > self.y_orig:
             self.y_float = self.y_orig
             self.is_jumping = False
-        if frame % 4 == 0:
+        if ctx.every(4):
             self.idx_sprite += 1
             if self.idx_sprite > 2:
                 self.idx_sprite = 0
@@ -133,10 +138,13 @@ class MarioRunningSprite(BaseSprite):
             SPRITE_MARIO_R_WALK_START if facing_right else SPRITE_MARIO_L_WALK_START
         )
 
-        self[0] = (
+        changed = self.set_tile(
             (SPRITE_MARIO_R_JUMP if facing_right else SPRITE_MARIO_L_JUMP)
             if self.is_jumping
             else walk_start_idx + self.idx_sprite
         )
-        self.y = int(self.y_float)
-        super().tick(frame, entities)
+        y = int(self.y_float)
+        if self.y != y:
+            self.y = y
+            changed = True
+        return super().tick(ctx) or changed
@@ -1,10 +1,9 @@
 import gc
 
 from displayio import Group
-from rtc import RTC
 
 from app.themes._base import BaseTheme
-from app.themes._common import CalendarLabel, ClockLabel
+from app.themes._common import CalendarLabel, DigitClock
 
 
 GRAVITY = 0.75
@@ -36,19 +35,26 @@ class SimpleTheme(BaseTheme):
         # Call base setup
         await super().setup()
         # Background
-        now = RTC().datetime
         group_labels = Group()
-        self.label_clock = ClockLabel(33, 2, font=self.font)
+        self.label_clock = DigitClock(33, 2, font=self.font)
         group_labels.append(self.label_clock)
         self.label_calendar = CalendarLabel(0, 2, font=self.font)
         group_labels.append(self.label_calendar)
         self.group.append(group_labels)
         gc.collect()
 
-    async def tick(self, state):
-        self.label_calendar.tick(state)
-        self.label_clock.tick(state)
-        await super().tick(state)
+    async def teardown(self):
+        self.label_clock.deinit()
+        self.label_calendar.deinit()
+        self.label_clock = self.label_calendar = None
+        await super().teardown()
+
+    async def tick(self, ctx):
+        if self.label_calendar.tick(ctx):
+            self.dirty = True
+        if self.label_clock.tick(ctx):
+            self.dirty = True
+        await super().tick(ctx)
 
     async def on_button(self):
         await super().on_button()
@@ -1,12 +1,13 @@
 import gc
 import math
 import time
-from displayio import Palette, OnDiskBitmap
-from cedargrove_palettefader.palettefader import PaletteFader
+from displayio import Bitmap, Palette, OnDiskBitmap
 
-PALETTE_GAMMA = 1.0
-PALETTE_BRIGHTNESS = 0.1
-PALETTE_NORMALIZE = True
+SPRITES_MODE_DISK = "disk"  # OnDiskBitmap, pixels re-read from flash on refresh
+SPRITES_MODE_RAM = "ram"  # whole sheet decoded into a displayio.Bitmap
+SPRITES_MODE_RAM_CROP = "ram_crop"  # only the rows holding the tiles in use
+SPRITES_MODES = (SPRITES_MODE_DISK, SPRITES_MODE_RAM, SPRITES_MODE_RAM_CROP)
+SPRITES_TILE_SIZE = 16
 
 
 def matrix_rotation(accelerometer):
@@ -42,22 +43,47 @@ def copy_update_palette(palette, updates=None):
     return palette_clone
 
 
-def load_sprites_brightness_adjusted(
+# Load the sprite sheet and its unadjusted palette; brightness is applied by
+# app.palettes.BrightnessPalette
+def load_sprites(
     filename,
-    brightness=PALETTE_BRIGHTNESS,
-    gamma=PALETTE_GAMMA,
-    normalize=PALETTE_NORMALIZE,
     transparent_index=None,
+    mode=SPRITES_MODE_DISK,
+    tile_count=None,
 ):
     gc.collect()
-    bitmap = OnDiskBitmap(filename)
-    palette = bitmap.pixel_shader
+    bitmap = palette = None
+    if mode != SPRITES_MODE_DISK:
+        try:
+            crop = tile_count if mode == SPRITES_MODE_RAM_CROP else None
+            bitmap, palette = load_sprites_ram(filename, crop)
+        except (ImportError, MemoryError) as error:
+            print(f"Sprites > Load Error: Mode={mode} | Error={error}")
+            bitmap = palette = None
+            gc.collect()
+    if bitmap is None:
+        bitmap = OnDiskBitmap(filename)
+        palette = bitmap.pixel_shader
     if transparent_index is not None:
         palette.make_transparent(transparent_index)
-    palette_adj = PaletteFader(
-        palette, PALETTE_BRIGHTNESS, PALETTE_GAMMA, PALETTE_NORMALIZE
-    )
-    return bitmap, palette_adj.palette
+    return bitmap, palette
+
+
+# Decode a sprite sheet into RAM, keeping only the rows of tiles needed for
+# the first tile_count tiles (all of them if tile_count is None)
+def load_sprites_ram(filename, tile_count=None, tile_size=SPRITES_TILE_SIZE):
+    import adafruit_imageload
+
+    bitmap, palette = adafruit_imageload.load(filename, bitmap=Bitmap, palette=Palette)
+    if tile_count:
+        per_row = bitmap.width // tile_size
+        height = -(-tile_count // per_row) * tile_size
+        if height < bitmap.height:
+            cropped = Bitmap(bitmap.width, height, len(palette))
+            cropped.blit(0, 0, bitmap, x1=0, y1=0, x2=bitmap.width, y2=height)
+            bitmap = cropped
+            gc.collect()
+    return bitmap, palette
 
 
 def parse_timestamp(timestamp, is_dst=-1):